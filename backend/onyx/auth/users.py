@@ -154,13 +154,8 @@ def user_needs_to_be_verified() -> bool:
 
 def anonymous_user_enabled(*, tenant_id: str | None = None) -> bool:
     redis_client = get_redis_client(tenant_id=tenant_id)
-    value = redis_client.get(OnyxRedisLocks.ANONYMOUS_USER_ENABLED)
-
-    if value is None:
-        return False
-
-    assert isinstance(value, bytes)
-    return int(value.decode("utf-8")) == 1
+    # stored as b"0" / b"1"; a missing key compares unequal and means disabled
+    return redis_client.get(OnyxRedisLocks.ANONYMOUS_USER_ENABLED) == b"1"
 
 
 def verify_email_is_invited(email: str) -> None:
@@ -1,8 +1,8 @@
-import json
 from collections import defaultdict
 from copy import deepcopy
 from typing import TypeVar
 
+import orjson
 from pydantic import BaseModel
 
 from onyx.chat.models import ContextualPruningConfig
@@ -205,7 +205,8 @@ def _apply_pruning(
             # If using tool message, it will be a bit of an overestimate as the extra json text around the section
             # will be counted towards the token count. However, once the Sections are merged, the extra json parts
             # that overlap will not be counted multiple times like it is in the pruning step.
-            json.dumps(section_to_dict(section, ind))
+            # Serialized the same way as the search tool message so the count matches what is sent.
+            orjson.dumps(section_to_dict(section, ind)).decode()
             if using_tool_message
             else build_doc_context_str(
                 semantic_identifier=section.center_chunk.semantic_identifier,
@@ -560,6 +560,11 @@ LLM_MODEL_UPDATE_API_URL = os.environ.get("LLM_MODEL_UPDATE_API_URL")
 # Maximum number of concurrent LLM API calls to prevent rate limiting
 # Particularly important for AWS Bedrock and other rate-limited providers
 LLM_API_CONCURRENCY_LIMIT = int(os.environ.get("LLM_API_CONCURRENCY_LIMIT", "3"))
+# Proactive per-minute request / token budgets for the LLM API. Calls wait for
+# budget before being dispatched instead of burning a round-trip on a 429.
+# 0 disables the corresponding limit.
+LLM_API_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_API_REQUESTS_PER_MINUTE", "0"))
+LLM_API_TOKENS_PER_MINUTE = int(os.environ.get("LLM_API_TOKENS_PER_MINUTE", "0"))
 
 #####
 # Enterprise Edition Configs
@@ -674,6 +679,12 @@ ONYX_QUERY_HISTORY_TYPE = QueryHistoryType(
     (os.environ.get("ONYX_QUERY_HISTORY_TYPE") or QueryHistoryType.NORMAL.value).lower()
 )
 
+# How long (seconds) a process may serve general Settings from its in-memory cache
+# before going back to the KV store / Redis. Writes also broadcast an invalidation
+# over Redis Pub/Sub, so this only bounds staleness if that message is missed.
+# 0 disables the cache.
+SETTINGS_CACHE_TTL = float(os.environ.get("SETTINGS_CACHE_TTL") or 60)
+
 #####
 # Web Configs
 #####
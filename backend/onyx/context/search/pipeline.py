@@ -361,7 +361,7 @@ class SearchPipeline:
     @property
     def section_relevance(self) -> list[SectionRelevancePiece] | None:
         if self._section_relevance is not None:
-            logger.info(f"llm doc relevance 2.5 {self._section_relevance}")
+            logger.info("llm doc relevance 2.5 %s", self._section_relevance)
             return self._section_relevance
 
         if (
@@ -415,16 +415,9 @@ class SearchPipeline:
 
     @property
     def section_relevance_list(self) -> list[bool]:
-        # When LLM relevance filtering is disabled, section_relevance is None
-        # In this case, we want all sections to be considered relevant
-        if self.section_relevance is None:
-            return [True] * len(self.final_context_sections)
-        
-        llm_indices = relevant_sections_to_indices(
-            relevance_sections=self.section_relevance,
-            items=self.final_context_sections,
+        return section_relevance_list_impl(
+            self.section_relevance, self.final_context_sections
         )
-        return [ind in llm_indices for ind in range(len(self.final_context_sections))]
 
     def _get_section_relevance(self, sections: list[InferenceSection]) -> list[SectionRelevancePiece]:
         """Get relevance scores for sections"""
@@ -484,7 +477,7 @@ class SearchPipeline:
             return evaluated_sections + remaining_sections
             
         except Exception as e:
-            logger.error(f"Error during LLM evaluation: {str(e)}")
+            logger.error("Error during LLM evaluation: %s", e)
             # In case of error, return all sections as relevant
             return [
                 SectionRelevancePiece(
@@ -494,3 +487,21 @@ class SearchPipeline:
                 )
                 for section in sections
             ]
+
+
+def section_relevance_list_impl(
+    section_relevance: list[SectionRelevancePiece] | None,
+    final_context_sections: list[InferenceSection],
+) -> list[bool]:
+    # When LLM relevance filtering is disabled, section_relevance is None
+    # In this case, we want all sections to be considered relevant
+    if section_relevance is None:
+        return [True] * len(final_context_sections)
+
+    llm_indices = set(
+        relevant_sections_to_indices(
+            relevance_sections=section_relevance,
+            items=final_context_sections,
+        )
+    )
+    return [ind in llm_indices for ind in range(len(final_context_sections))]
@@ -1,7 +1,7 @@
 import datetime
 from uuid import UUID
 from collections import defaultdict
-from typing import Dict, Any, List
+from typing import Any, List, Tuple
 
 from sqlalchemy.orm import Session
 from sqlalchemy import case, func, select, and_
@@ -273,11 +273,11 @@ def fetch_user_assistant_usage(
     db_session: Session,
     start: datetime.datetime,
     end: datetime.datetime,
-) -> List[Dict[str, Any]]:
+) -> Tuple[List[str], List[Tuple[Any, ...]]]:
     """
     Returns aggregated and pivoted usage metrics for each user.
 
-    The output is a list of dictionaries, one for each user, with columns
+    The output is a header list plus one row tuple per user in header order, with columns
     dynamically created for each assistant's metrics (Queries, Tokens, Likes, Dislikes)
     plus overall totals for each user.
     """
@@ -300,65 +300,68 @@ def fetch_user_assistant_usage(
         .group_by(User.email, Persona.name)
     )
 
-    raw_results = db_session.execute(raw_usage_query).mappings().all()
-
-    # Get unique assistant list
-    all_assistants = sorted({row["assistant_name"] for row in raw_results})
-
-    # 2. Process into pivot structure
+    # 2. Process into pivot structure in a single pass over the result rows
+    all_assistants: set[str] = set()
     users_data = defaultdict(
         lambda: {"total_tokens": 0, "total_queries": 0, "total_likes": 0, "total_dislikes": 0}
     )
 
-    for row in raw_results:
-        user_email = row["user_email"]
-        assistant_name = row["assistant_name"]
+    for row in db_session.execute(raw_usage_query):
+        all_assistants.add(row.assistant_name)
+        user_data = users_data[row.user_email]
 
         # Store assistant metrics
-        users_data[user_email][assistant_name] = {
-            "queries": row["queries"],
-            "tokens": row["tokens"],
-            "likes": row["likes"],
-            "dislikes": row["dislikes"],
-        }
+        user_data[row.assistant_name] = (row.queries, row.tokens, row.likes, row.dislikes)
 
         # Update totals
-        users_data[user_email]["total_queries"] += row["queries"]
-        users_data[user_email]["total_tokens"] += row["tokens"]
-        users_data[user_email]["total_likes"] += row["likes"]
-        users_data[user_email]["total_dislikes"] += row["dislikes"]
+        user_data["total_queries"] += row.queries
+        user_data["total_tokens"] += row.tokens
+        user_data["total_likes"] += row.likes
+        user_data["total_dislikes"] += row.dislikes
+
+    sorted_assistants = sorted(all_assistants)
+
+    # 3. Flatten into header-ordered rows
+    headers = ["user_email"]
+    for assistant in sorted_assistants:
+        headers.extend(
+            [
+                f"{assistant}_Queries",
+                f"{assistant}_Total_Token",  # singular to match docstring
+                f"{assistant}_Total_Likes",
+                f"{assistant}_Total_Dislikes",
+            ]
+        )
+    headers.extend(["total_queries", "total_tokens", "total_likes", "total_dislikes"])
 
-    # 3. Flatten into final list
-    final_report = []
+    empty_stats = (0, 0, 0, 0)
+    rows = []
     for email, data in users_data.items():
-        user_row = {"user_email": email}
-
-        for assistant in all_assistants:
-            stats = data.get(assistant, {"queries": 0, "tokens": 0, "likes": 0, "dislikes": 0})
-            user_row[f"{assistant}_Queries"] = stats["queries"]
-            user_row[f"{assistant}_Total_Token"] = stats["tokens"]  # singular to match docstring
-            user_row[f"{assistant}_Total_Likes"] = stats["likes"]
-            user_row[f"{assistant}_Total_Dislikes"] = stats["dislikes"]
-
-        user_row["total_queries"] = data["total_queries"]
-        user_row["total_tokens"] = data["total_tokens"]
-        user_row["total_likes"] = data["total_likes"]
-        user_row["total_dislikes"] = data["total_dislikes"]
-
-        final_report.append(user_row)
+        user_row: List[Any] = [email]
+        for assistant in sorted_assistants:
+            user_row.extend(data.get(assistant, empty_stats))
+        user_row.extend(
+            [
+                data["total_queries"],
+                data["total_tokens"],
+                data["total_likes"],
+                data["total_dislikes"],
+            ]
+        )
+        rows.append(tuple(user_row))
 
-    return final_report
+    return headers, rows
 
 
 def fetch_kb_assistant_usage(
     db_session: Session,
     start: datetime.datetime,
     end: datetime.datetime,
-) -> List[Dict[str, Any]]:
+) -> Tuple[List[str], List[Tuple[Any, ...]]]:
     """
     Returns aggregated and pivoted usage metrics for each knowledge base.
 
-    The output is a list of dictionaries, one for each KB, with columns
+    The output is a header list plus one row tuple per KB in header order, with columns
     dynamically created for each assistant's metrics (Requests and Tokens),
     followed by overall totals for each KB.
     """
@@ -391,36 +394,33 @@ def fetch_kb_assistant_usage(
         .order_by(ConnectorCredentialPair.name, Persona.name)
     )
 
-    raw_results = db_session.execute(raw_usage_query).mappings().all()
-
-    # Get all unique assistants
-    all_assistants = sorted({row["assistant_name"] for row in raw_results})
-
-    # 2. Process into nested structure
+    # 2. Process into nested structure in a single pass over the result rows
+    all_assistants: set[str] = set()
     kbs_data = defaultdict(lambda: {"total_requests": 0})
 
-    for row in raw_results:
-        kb_name = row["cc_pair_name"]
-        assistant_name = row["assistant_name"]
-
-        requests = row["accurate_request_count"]
-        kbs_data[kb_name][assistant_name] = {
-            "requests": requests,
-        }
+    for row in db_session.execute(raw_usage_query):
+        all_assistants.add(row.assistant_name)
+        kb_data = kbs_data[row.cc_pair_name]
 
-        kbs_data[kb_name]["total_requests"] += requests
+        kb_data[row.assistant_name] = row.accurate_request_count
+        kb_data["total_requests"] += row.accurate_request_count
 
-    # 3. Flatten into final report
-    final_report = []
-    for kb_name, data in kbs_data.items():
-        kb_row = {"knowledge_base": kb_name}
+    sorted_assistants = sorted(all_assistants)
 
-        for assistant in all_assistants:
-            stats = data.get(assistant, {"requests": 0})
-            kb_row[f"{assistant}_Number of requests"] = stats["requests"]
-
-        kb_row["Total Number of requests"] = data["total_requests"]
+    # 3. Flatten into header-ordered rows
+    headers = (
+        ["knowledge_base"]
+        + [f"{assistant}_Number of requests" for assistant in sorted_assistants]
+        + ["Total Number of requests"]
+    )
 
-        final_report.append(kb_row)
+    rows = [
+        (
+            kb_name,
+            *(data.get(assistant, 0) for assistant in sorted_assistants),
+            data["total_requests"],
+        )
+        for kb_name, data in kbs_data.items()
+    ]
 
-    return final_report
+    return headers, rows
@@ -470,7 +470,8 @@ class S3BackedFileStore(FileStore):
         # Read content from IO object
         if hasattr(content, "read"):
             file_content = content.read()
-            if hasattr(content, "seek"):
+            # non-seekable streams (e.g. HTTP response bodies) can only be read once
+            if hasattr(content, "seek") and getattr(content, "seekable", lambda: True)():
                 content.seek(0)  # Reset position for potential re-reads
         else:
             file_content = content
@@ -1,5 +1,6 @@
 from collections.abc import Sequence
 from datetime import datetime
+from functools import lru_cache
 from typing import cast
 
 from langchain_core.messages import BaseMessage
@@ -91,6 +92,8 @@ CONNECTOR_NAME_MAP = {
 }
 
 
+# called once per document when rendering search results, over a small fixed set of sources
+@lru_cache(maxsize=256)
 def clean_up_source(source_str: str) -> str:
     if source_str in CONNECTOR_NAME_MAP:
         return CONNECTOR_NAME_MAP[source_str]
@@ -1,8 +1,17 @@
+from collections import OrderedDict
 from collections.abc import Callable
+from functools import lru_cache
+import hashlib
 import re
+import threading
 import time
+from typing import Any
 from typing import Callable
 from typing import cast
+
+import orjson
+
+from onyx.natural_language_processing.utils import BaseTokenizer
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.utils.timing import log_function_time
 from onyx.configs.app_configs import LLM_API_CONCURRENCY_LIMIT
@@ -11,13 +20,101 @@ from onyx.llm.interfaces import LLM, LLMConfig
 from onyx.llm.utils import check_number_of_tokens, dict_based_prompt_to_langchain_prompt
 from onyx.llm.utils import message_to_string
 from onyx.prompts.llm_chunk_filter import NONUSEFUL_PAT
+from onyx.prompts.llm_chunk_filter import USEFUL_PAT
 from onyx.prompts.llm_chunk_filter import SECTION_FILTER_PROMPT
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import get_llm_api_token_bucket
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel_with_rate_limiting
 from onyx.llm.interfaces import LLMConfig
 
 logger = setup_logger()
 
+# Bounded LRU of relevance verdicts keyed by a content hash of everything that
+# goes into the prompt, so re-scoring the same sections (pagination, query
+# reformulation, multilingual expansion) doesn't re-invoke the LLM.
+_SECTION_VERDICT_CACHE_MAX_SIZE = 4096
+_SECTION_VERDICT_CACHE: OrderedDict[bytes, bool | list[bool]] = OrderedDict()
+_SECTION_VERDICT_CACHE_LOCK = threading.Lock()
+
+# One "<section_number>: Yes/No" verdict per line of the batched LLM output.
+# Leading non-word characters are tolerated for markdown-ish output (e.g. "- 3: Yes", "**3**: No")
+_VERDICT_RE = re.compile(
+    r"^[^\w\n]*(\d+)[^\w\n]*\s*[:\-]\s*(yes|no)\b", re.IGNORECASE | re.MULTILINE
+)
+
+
+def _section_verdict_cache_key(*parts: object) -> bytes:
+    # orjson emits sorted-key canonical bytes natively, feeding the hash without a str round-trip
+    canonical = orjson.dumps(parts, option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
+
+def _get_cached_verdict(key: bytes) -> bool | list[bool] | None:
+    with _SECTION_VERDICT_CACHE_LOCK:
+        verdict = _SECTION_VERDICT_CACHE.get(key)
+        if verdict is not None:
+            _SECTION_VERDICT_CACHE.move_to_end(key)
+        return verdict
+
+
+def _set_cached_verdict(key: bytes, verdict: bool | list[bool]) -> None:
+    with _SECTION_VERDICT_CACHE_LOCK:
+        _SECTION_VERDICT_CACHE[key] = verdict
+        _SECTION_VERDICT_CACHE.move_to_end(key)
+        while len(_SECTION_VERDICT_CACHE) > _SECTION_VERDICT_CACHE_MAX_SIZE:
+            _SECTION_VERDICT_CACHE.popitem(last=False)
+
+
+_MetadataItems = tuple[tuple[str, str], ...]
+
+
+def _metadata_items(metadata: dict[str, str | list[str]]) -> _MetadataItems:
+    """Hashable form of a metadata dict with list values already joined, so rendering
+    can be cached across the many sections that share one document's metadata."""
+    return tuple(
+        (key, ", ".join(value) if isinstance(value, list) else value)
+        for key, value in metadata.items()
+    )
+
+
+@lru_cache(maxsize=1024)
+def _render_metadata_str(items: _MetadataItems) -> str:
+    return "\nMetadata:\n" + "".join(f"{key} - {value}\n" for key, value in items)
+
+
+@lru_cache(maxsize=1024)
+def _render_batch_metadata_str(items: _MetadataItems) -> str:
+    return "\nMetadata:\n" + "\n".join(f"{key} - {value}" for key, value in items)
+
+
+def _get_metadata_str(metadata: dict[str, str | list[str]]) -> str:
+    return _render_metadata_str(_metadata_items(metadata))
+
+
+def _get_section_filter_prompt(
+    query: str,
+    section_content: str,
+    title: str,
+    metadata: dict[str, str | list[str]],
+) -> str:
+    return SECTION_FILTER_PROMPT.format(
+        title=title.replace("\n", " "),
+        chunk_text=section_content,
+        user_query=query,
+        optional_metadata=_get_metadata_str(metadata) if metadata else "",
+    )
+
+
+_EXACT_USEFULNESS_ANSWERS = {USEFUL_PAT.lower(), NONUSEFUL_PAT.lower()}
+
+
+def _extract_usefulness(model_output: str) -> bool:
+    """Default useful if the LLM doesn't match pattern exactly
+    This is because it's better to trust the (re)ranking if LLM fails"""
+    if model_output.strip().strip('"').lower() == NONUSEFUL_PAT.lower():
+        return False
+    return True
+
 
 def llm_eval_section(
     query: str,
@@ -29,98 +126,124 @@ def llm_eval_section(
     """
     Evaluate one section in a single LLM call.
     """
-    def _get_metadata_str(metadata: dict[str, str | list[str]]) -> str:
-        metadata_str = "\nMetadata:\n"
-        for key, value in metadata.items():
-            value_str = ", ".join(value) if isinstance(value, list) else value
-            metadata_str += f"{key} - {value_str}\n"
-        return metadata_str
-
-    def _get_usefulness_messages() -> list[dict[str, str]]:
-        metadata_str = _get_metadata_str(metadata) if metadata else ""
-        messages = [
-            {
-                "role": "user",
-                "content": SECTION_FILTER_PROMPT.format(
-                    title=title.replace("\n", " "),
-                    chunk_text=section_content,
-                    user_query=query,
-                    optional_metadata=metadata_str,
-                ),
-            },
-        ]
-        return messages
-
-    def _extract_usefulness(model_output: str) -> bool:
-        """Default useful if the LLM doesn't match pattern exactly
-        This is because it's better to trust the (re)ranking if LLM fails"""
-        if model_output.strip().strip('"').lower() == NONUSEFUL_PAT.lower():
-            return False
-        return True
-
-    messages = _get_usefulness_messages()
+    cache_key = _section_verdict_cache_key(
+        query, title, section_content, metadata, llm.config.model_name
+    )
+    cached_verdict = _get_cached_verdict(cache_key)
+    if cached_verdict is not None:
+        return cast(bool, cached_verdict)
+
+    messages = [
+        {
+            "role": "user",
+            "content": _get_section_filter_prompt(query, section_content, title, metadata),
+        },
+    ]
     filled_llm_prompt = dict_based_prompt_to_langchain_prompt(messages)
     model_output = message_to_string(llm.invoke(filled_llm_prompt))
     #logger.debug(model_output)
 
-    return _extract_usefulness(model_output)
+    verdict = _extract_usefulness(model_output)
+    # an answer matching neither pattern only defaults to useful, don't remember that
+    if model_output.strip().strip('"').lower() in _EXACT_USEFULNESS_ANSWERS:
+        _set_cached_verdict(cache_key, verdict)
+    return verdict
 
 
-def llm_eval_sections_single_batch(
+def _render_batch_metadata(metadata: dict[str, str | list[str]]) -> str:
+    if not metadata:
+        return ""
+    return _render_batch_metadata_str(_metadata_items(metadata))
+
+
+def _build_batch_prompt(
     query: str,
     section_contents: list[str],
-    llm: LLM,
     titles: list[str],
     metadata_list: list[dict[str, str | list[str]]],
-) -> list[bool]:
-    """
-    Evaluate a batch of sections in a single LLM call.
-    Returns a list of booleans indicating relevance per section.
-    """
-    start_time = time.time()
-
-    # Build combined prompt
-    batch_prompt_lines = [
+) -> str:
+    header = [
         f"Query: \"{query}\"",
         "For each section below, reply ONLY with 'Yes' if relevant to the query or 'No' if not relevant.",
         "Format your output as: <section_number>: Yes/No",
         "",
     ]
 
-    for idx, (content, title, metadata) in enumerate(zip(section_contents, titles, metadata_list), start=1):
-        metadata_str = ""
-        if metadata:
-            metadata_str = "\nMetadata:\n" + "\n".join(
-                f"{k} - {', '.join(v) if isinstance(v, list) else v}" for k, v in metadata.items()
-            )
+    # Sections from the same document share one metadata dict, render it only once
+    metadata_strs: dict[int, str] = {}
+    for metadata in metadata_list:
+        if id(metadata) not in metadata_strs:
+            metadata_strs[id(metadata)] = _render_batch_metadata(metadata)
 
-        clean_title = title.replace("\n", " ")
-        batch_prompt_lines.append(
-            f"{idx}. Title: {clean_title}{metadata_str}Content: {content}"
+    clean_titles = [
+        title.replace("\n", " ") if "\n" in title else title for title in titles
+    ]
+    body = [
+        f"{idx}. Title: {title}{metadata_strs[id(metadata)]}Content: {content}"
+        for idx, (content, title, metadata) in enumerate(
+            zip(section_contents, clean_titles, metadata_list), start=1
         )
+    ]
 
+    return "\n".join(header + body)
 
-    full_prompt = "\n".join(batch_prompt_lines)
 
-    token_start_time = time.time()
-    token_count = check_tokens_of_batched_prompt(full_prompt, llm.config) 
-    token_end_time = time.time()
+def llm_eval_sections_single_batch(
+    query: str,
+    section_contents: list[str],
+    llm: LLM,
+    titles: list[str],
+    metadata_list: list[dict[str, str | list[str]]],
+    full_prompt: str | None = None,
+    token_count: int | None = None,
+) -> list[bool]:
+    """
+    Evaluate a batch of sections in a single LLM call.
+    Returns a list of booleans indicating relevance per section.
+    full_prompt/token_count can be passed in when the caller already built/counted them.
+    """
+    start_time = time.perf_counter()
+
+    if full_prompt is None:
+        full_prompt = _build_batch_prompt(query, section_contents, titles, metadata_list)
+
+    cache_key = _section_verdict_cache_key(full_prompt, llm.config.model_name)
+    cached_verdicts = _get_cached_verdict(cache_key)
+    if cached_verdicts is not None:
+        logger.info("Batch verdict cache hit for %d sections", len(section_contents))
+        return list(cast(list[bool], cached_verdicts))
+
+    token_start_time = time.perf_counter()
+    if token_count is None:
+        token_count = check_tokens_of_batched_prompt(full_prompt, llm.config)
+    token_end_time = time.perf_counter()
 
     messages = [{"role": "user", "content": full_prompt}]
     filled_llm_prompt = dict_based_prompt_to_langchain_prompt(messages)
     model_output = message_to_string(llm.invoke(filled_llm_prompt))
-    output_end_time = time.time()
-
-    # Parse LLM output
-    results = []
-    for idx in range(1, len(section_contents) + 1):
-        line_match = re.search(rf"{idx}\s*[:\-]\s*(yes|no)", model_output, re.IGNORECASE)
-        results.append(line_match.group(1).strip().lower() == "yes" if line_match else True)
-
-    logger.info(f"Token count for batch took: {token_end_time - token_start_time:.2f}s")
-    logger.info(f"LLM call for batch took: {output_end_time - token_end_time:.2f}s")
-    logger.info(f"Final token count for batch : {token_count}") 
-    logger.info(f"Batch evaluation completed in {time.time() - start_time:.2f}s for {len(section_contents)} sections")
+    output_end_time = time.perf_counter()
+
+    # Parse LLM output in a single pass; first verdict per section wins and
+    # sections the LLM skipped default to relevant
+    verdicts: dict[int, bool] = {}
+    for match in _VERDICT_RE.finditer(model_output):
+        verdicts.setdefault(int(match.group(1)), match.group(2).lower() == "yes")
+    results = [verdicts.get(idx, True) for idx in range(1, len(section_contents) + 1)]
+
+    # only cache when every section got an actual verdict, defaults from an
+    # unparseable or partial answer shouldn't outlive this call
+    if all(idx in verdicts for idx in range(1, len(section_contents) + 1)):
+        _set_cached_verdict(cache_key, list(results))
+
+    # lazy %-formatting: nothing is rendered unless INFO is enabled
+    logger.info("Token count for batch took: %.2fs", token_end_time - token_start_time)
+    logger.info("LLM call for batch took: %.2fs", output_end_time - token_end_time)
+    logger.info("Final token count for batch : %d", token_count)
+    logger.info(
+        "Batch evaluation completed in %.2fs for %d sections",
+        time.perf_counter() - start_time,
+        len(section_contents),
+    )
     return results
 
 
@@ -136,7 +259,8 @@ def llm_batch_eval_sections(
     metadata_list: list[dict[str, str | list[str]]],
     use_threads: bool = True, # Important to enable this for parallelization
     use_single_batch: bool = False,
-    batch_size: int = 25  # If set, will process in chunks of this size
+    batch_size: int = 25,  # If set, will process in chunks of this size
+    preserve_order: bool = False,  # If set, batches follow arrival order instead of length buckets
 ) -> list[bool]:
     """
     Evaluate section relevance using one of four modes:
@@ -144,6 +268,10 @@ def llm_batch_eval_sections(
     2. Single batch of all sections (use_threads=False, use_single_batch=True, batch_size=None)
     3. Threaded per-section calls (original, use_threads=True, use_single_batch=False, batch_size=None)
     4. Fallback: Sequential execution of per-section calls
+
+    In the batch-size mode sections are bucketed by length before batching so a single
+    long section doesn't drag a batch of short ones through a large-context call.
+    Results are always returned in the original section order.
     """
 
     if DISABLE_LLM_DOC_RELEVANCE:
@@ -153,7 +281,7 @@ def llm_batch_eval_sections(
     # Mode 2: Single-batch evaluation (all sections at once)
     # -------------------------------------------------
     if use_single_batch and not batch_size:
-        logger.info(f"Running SINGLE-BATCH evaluation for {len(section_contents)} sections")
+        logger.info("Running SINGLE-BATCH evaluation for %d sections", len(section_contents))
         return llm_eval_sections_single_batch(query, section_contents, llm, titles, metadata_list)
 
 
@@ -162,22 +290,63 @@ def llm_batch_eval_sections(
     # -------------------------------------------------
 
     if batch_size and batch_size > 0:
-        logger.info(f"Running BATCH-SIZE evaluation: {batch_size} per batch, total {len(section_contents)} sections")
-        start_time = time.time()
+        logger.info(
+            "Running BATCH-SIZE evaluation: %d per batch, total %d sections",
+            batch_size,
+            len(section_contents),
+        )
+        start_time = time.perf_counter()
 
-        # Build batches
-        batch_args = []
-        for start_idx in range(0, len(section_contents), batch_size):
-            end_idx = min(start_idx + batch_size, len(section_contents))
-            batch_sections = section_contents[start_idx:end_idx]
-            batch_titles = titles[start_idx:end_idx]
-            batch_metadata = metadata_list[start_idx:end_idx]
+        # Build batches over length-sorted sections, remembering the original positions
+        if preserve_order:
+            order = list(range(len(section_contents)))
+        else:
+            order = sorted(
+                range(len(section_contents)), key=lambda i: len(section_contents[i])
+            )
 
-            batch_args.append((query, batch_sections, llm, batch_titles, batch_metadata))
+        # Verdicts are written in place at each section's original position
+        final_results = [False] * len(section_contents)
+
+        batch_args: list[tuple[Any, ...]] = []
+        batch_index_lists = []
+        for start_idx in range(0, len(order), batch_size):
+            batch_indices = order[start_idx:start_idx + batch_size]
+            batch_index_lists.append(batch_indices)
+            batch_sections = [section_contents[i] for i in batch_indices]
+            batch_titles = [titles[i] for i in batch_indices]
+            batch_metadata = [metadata_list[i] for i in batch_indices]
+            batch_prompt = _build_batch_prompt(
+                query, batch_sections, batch_titles, batch_metadata
+            )
+
+            batch_args.append(
+                (query, batch_sections, llm, batch_titles, batch_metadata, batch_prompt)
+            )
 
         # Option A: Parallelize batch calls
         if use_threads:
-            logger.info(f"Processing {len(batch_args)} batches in parallel with threads")
+            logger.info("Processing %d batches in parallel with threads", len(batch_args))
+
+            # Predict each batch's prompt size up front so dispatch can wait for
+            # token budget instead of discovering the limit through a 429. The counts
+            # are handed to the batches so they aren't tokenized a second time
+            token_bucket = get_llm_api_token_bucket()
+            pre_acquire_fn: Callable[[int], None] | None = None
+            if token_bucket.enabled:
+                predicted_tokens = [
+                    check_tokens_of_batched_prompt(args[5], llm.config)
+                    for args in batch_args
+                ]
+                batch_args = [
+                    (*args, token_count)
+                    for args, token_count in zip(batch_args, predicted_tokens)
+                ]
+
+                def acquire_predicted_tokens(index: int) -> None:
+                    token_bucket.acquire(predicted_tokens[index])
+
+                pre_acquire_fn = acquire_predicted_tokens
 
             functions_with_args = [
                 (llm_eval_sections_single_batch, args) for args in batch_args
@@ -188,56 +357,76 @@ def llm_batch_eval_sections(
                 allow_failures=True,
                 max_workers=LLM_API_CONCURRENCY_LIMIT,
                 use_rate_limiting=True,
-                use_retry=True
+                use_retry=True,
+                pre_acquire_fn=pre_acquire_fn,
             )
 
-            # Flatten results from all batches
-            all_results = []
-            for batch_result in parallel_results:
+            for args, batch_indices, batch_result in zip(
+                batch_args, batch_index_lists, parallel_results
+            ):
                 if batch_result is None:
-                    logger.warning("A batch failed, marking all its items as False")
-                    all_results.extend([False] * batch_size)
-                else:
-                    all_results.extend(batch_result)
+                    # The batch already went through the retry path, so give it exactly
+                    # one more synchronous attempt before giving up on its sections
+                    batch_len = len(args[1])
+                    logger.warning(
+                        f"A batch of {batch_len} sections failed, retrying it once sequentially"
+                    )
+                    try:
+                        batch_result = llm_eval_sections_single_batch(*args)
+                    except Exception as e:
+                        # its slots keep the preallocated False
+                        logger.warning(
+                            f"Batch retry failed, marking its {batch_len} items as False: {e}"
+                        )
+                        continue
+                for original_idx, verdict in zip(batch_indices, batch_result):
+                    final_results[original_idx] = verdict
 
         # Option B: Sequential batches
         else:
             logger.info("Processing batches sequentially")
-            all_results = []
-            for idx, args in enumerate(batch_args, start=1):
-                logger.debug(f"Processing batch {idx}/{len(batch_args)}")
+            for idx, (args, batch_indices) in enumerate(
+                zip(batch_args, batch_index_lists), start=1
+            ):
+                logger.debug("Processing batch %d/%d", idx, len(batch_args))
                 batch_result = llm_eval_sections_single_batch(*args)
-                all_results.extend(batch_result)
+                for original_idx, verdict in zip(batch_indices, batch_result):
+                    final_results[original_idx] = verdict
 
-        logger.info(f"Batch-size evaluation completed in {time.time() - start_time:.2f}s")
-        return all_results
+        logger.info("Batch-size evaluation completed in %.2fs", time.perf_counter() - start_time)
+        return final_results
 
     # -------------------------------------------------
     # Mode 1: Traditional threaded per-section calls
     # -------------------------------------------------
     if use_threads:
-        logger.info(f"Running THREADED evaluation for {len(section_contents)} sections")
-        start_time = time.time()
+        logger.info("Running THREADED evaluation for %d sections", len(section_contents))
+        start_time = time.perf_counter()
 
         functions_with_args: list[tuple[Callable, tuple]] = [
             (llm_eval_section, (query, section_content, llm, title, metadata))
             for section_content, title, metadata in zip(section_contents, titles, metadata_list)
         ]
 
+        token_bucket = get_llm_api_token_bucket()
         parallel_results = run_functions_tuples_in_parallel_with_rate_limiting(
             functions_with_args,
             allow_failures=True,
             max_workers=LLM_API_CONCURRENCY_LIMIT,
             use_rate_limiting=True,
-            use_retry=True
+            use_retry=True,
+            pre_acquire_fn=(lambda _: token_bucket.acquire()) if token_bucket.enabled else None,
         )
 
         failed_count = sum(1 for item in parallel_results if item is None)
         if failed_count > 0:
             logger.warning(f"{failed_count}/{len(parallel_results)} threaded calls failed. Marking them as False.")
 
-        logger.info(f"Threaded evaluation completed in {time.time() - start_time:.2f}s")
-        results = [False if item is None else item for item in parallel_results]
+        logger.info("Threaded evaluation completed in %.2fs", time.perf_counter() - start_time)
+        results = [False] * len(section_contents)
+        for idx, item in enumerate(parallel_results):
+            if item is not None:
+                results[idx] = item
 
         return results
 
@@ -245,21 +434,32 @@ def llm_batch_eval_sections(
     # -------------------------------------------------
     # Mode 4 (Sequential fallback)
     # -------------------------------------------------
-    logger.info(f"Running SEQUENTIAL evaluation for {len(section_contents)} sections")
-    start_time = time.time()
+    logger.info("Running SEQUENTIAL evaluation for %d sections", len(section_contents))
+    start_time = time.perf_counter()
     results = [
         llm_eval_section(query, section_content, llm, title, metadata)
         for section_content, title, metadata in zip(section_contents, titles, metadata_list)
     ]
-    logger.info(f"Sequential evaluation completed in {time.time() - start_time:.2f}s")
+    logger.info("Sequential evaluation completed in %.2fs", time.perf_counter() - start_time)
     return results
 
 
+@lru_cache(maxsize=32)
+def _cached_tokenizer_encode(
+    provider_type: str, model_name: str
+) -> Callable[[str], list[int]]:
+    """Resolve the tokenizer for an LLM once and hand back its bound encode method,
+    so batched token counting doesn't re-resolve the tokenizer on every batch."""
+    llm_tokenizer: BaseTokenizer = get_tokenizer(
+        provider_type=provider_type,
+        model_name=model_name,
+    )
+    return cast(Callable[[str], list[int]], llm_tokenizer.encode)
+
+
 def check_tokens_of_batched_prompt(prompt: str, llm_config: LLMConfig) -> int:
-    llm_tokenizer = get_tokenizer(
-        provider_type=llm_config.model_provider,
-        model_name=llm_config.model_name,
+    llm_tokenizer_encode_func = _cached_tokenizer_encode(
+        llm_config.model_provider, llm_config.model_name
     )
-    llm_tokenizer_encode_func = cast(Callable[[str], list[int]], llm_tokenizer.encode)
 
-    return check_number_of_tokens(prompt, llm_tokenizer_encode_func)
\ No newline at end of file
+    return check_number_of_tokens(prompt, llm_tokenizer_encode_func)
@@ -1,8 +1,15 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
 from collections.abc import Callable
+from functools import lru_cache
 
 from onyx.chat.models import PromptConfig
 from onyx.chat.chat_utils import combine_message_chain
 from onyx.configs.chat_configs import DISABLE_LLM_QUERY_REPHRASE
+from onyx.configs.chat_configs import QA_TIMEOUT
 from onyx.configs.model_configs import GEN_AI_HISTORY_CUTOFF
 from onyx.db.models import ChatMessage
 from onyx.file_store.models import InMemoryChatFile, ChatFileType
@@ -20,9 +27,68 @@ from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel_w
 from langchain_core.messages import BaseMessage
 from langchain_core.messages import HumanMessage
 from onyx.llm.utils import build_content_with_imgs
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+# Default LLM handles are reused for this long before the provider config is re-read,
+# so changes made through another worker are picked up without a restart
+_DEFAULT_LLMS_CACHE_TTL_SECONDS = 60
+
+
+@lru_cache(maxsize=32)
+def _default_llms_cached(
+    tenant_id: str, timeout: int, ttl_bucket: int
+) -> tuple[LLM, LLM] | None:
+    """None is cached as the sentinel for Gen AI being disabled."""
+    try:
+        return get_default_llms(timeout=timeout)
+    except GenAIDisabledException:
+        return None
+
+
+def _get_default_llms_cached(timeout: int = QA_TIMEOUT) -> tuple[LLM, LLM] | None:
+    ttl_bucket = int(time.monotonic() // _DEFAULT_LLMS_CACHE_TTL_SECONDS)
+    return _default_llms_cached(get_current_tenant_id(), timeout, ttl_bucket)
+
+
+def clear_default_llms_cache() -> None:
+    """Call whenever the LLM provider configuration changes."""
+    _default_llms_cached.cache_clear()
+
+
+# Recent rephrases by input: a re-submit of the same query over the same history
+# (common UI bounce) reuses the previous result instead of re-sending the whole history
+_REPHRASE_CACHE_MAX_SIZE = 1024
+_REPHRASE_CACHE: OrderedDict[str, str] = OrderedDict()
+_REPHRASE_CACHE_LOCK = threading.Lock()
+
+
+def _rephrase_input_hash(
+    query: str, history_str: str, note: str | None, prompt_template: str, llm: LLM
+) -> str:
+    hasher = hashlib.sha1()
+    for part in (query, history_str, note or "", prompt_template, llm.config.model_name):
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\x00")
+    return hasher.hexdigest()
+
+
+def _get_cached_rephrase(input_hash: str) -> str | None:
+    with _REPHRASE_CACHE_LOCK:
+        cached = _REPHRASE_CACHE.get(input_hash)
+        if cached is not None:
+            _REPHRASE_CACHE.move_to_end(input_hash)
+        return cached
+
+
+def _cache_rephrase(input_hash: str, rephrased_query: str) -> None:
+    with _REPHRASE_CACHE_LOCK:
+        _REPHRASE_CACHE[input_hash] = rephrased_query
+        _REPHRASE_CACHE.move_to_end(input_hash)
+        while len(_REPHRASE_CACHE) > _REPHRASE_CACHE_MAX_SIZE:
+            _REPHRASE_CACHE.popitem(last=False)
+
 
 def llm_multilingual_query_expansion(query: str, language: str) -> str:
     def _get_rephrase_messages() -> list[dict[str, str]]:
@@ -37,13 +103,13 @@ def llm_multilingual_query_expansion(query: str, language: str) -> str:
 
         return messages
 
-    try:
-        _, fast_llm = get_default_llms(timeout=5)
-    except GenAIDisabledException:
+    default_llms = _get_default_llms_cached(timeout=5)
+    if default_llms is None:
         logger.warning(
             "Unable to perform multilingual query expansion, Gen AI disabled"
         )
         return query
+    _, fast_llm = default_llms
 
     messages = _get_rephrase_messages()
     filled_llm_prompt = dict_based_prompt_to_langchain_prompt(messages)
@@ -126,14 +192,14 @@ def history_based_query_rephrase(
     prompt_template: str = HISTORY_QUERY_REPHRASE,
     uploaded_files: list[InMemoryChatFile] | None = None,
 ) -> str:
-    logger.info(f"inside history_based_query_rephrase function")
+    logger.info("inside history_based_query_rephrase function")
 
     # Globally disabled, just use the exact user query
     if DISABLE_LLM_QUERY_REPHRASE:
         return query
     # For some use cases, the first query should be untouched. Later queries must be rephrased
     # due to needing context but the first query has no context.
-    logger.info(f"skip_first_rephrase: {skip_first_rephrase}")
+    logger.info("skip_first_rephrase: %s", skip_first_rephrase)
     
     # If it's a very large query, assume it's a copy paste which we may want to find exactly
     # or at least very closely, so don't rephrase it
@@ -152,13 +218,22 @@ def history_based_query_rephrase(
             messages=history, token_limit=GEN_AI_HISTORY_CUTOFF
         )
     
-    logger.debug(f"query in history_based_query_rephrase is: {query}")
+    logger.debug("query in history_based_query_rephrase is: %s", query)
+
+    # Uploaded files change the prompt in ways the hash doesn't capture, so those are never reused
+    input_hash: str | None = None
+    if not uploaded_files:
+        input_hash = _rephrase_input_hash(query, history_str, note, prompt_template, llm)
+        cached_rephrase = _get_cached_rephrase(input_hash)
+        if cached_rephrase is not None:
+            logger.info("Reusing rephrased query for unchanged history")
+            return cached_rephrase
     
     # Log uploaded files for debugging
-    if uploaded_files:
-        logger.info(f"[FILE TRACKING] Query rephrase processing {len(uploaded_files)} uploaded files")
+    if uploaded_files and logger.isEnabledFor(logging.INFO):
+        logger.info("[FILE TRACKING] Query rephrase processing %d uploaded files", len(uploaded_files))
         for file in uploaded_files:
-            logger.info(f"[FILE TRACKING] File: {file.filename}, Type: {file.file_type.value}")
+            logger.info("[FILE TRACKING] File: %s, Type: %s", file.filename, file.file_type.value)
     
     # Create messages with file support
     filled_llm_prompt = get_contextual_rephrase_messages(
@@ -171,7 +246,10 @@ def history_based_query_rephrase(
     
     rephrased_query = message_to_string(llm.invoke(filled_llm_prompt))
 
-    logger.info(f"rephrased combined query: {rephrased_query}")
+    logger.info("rephrased combined query: %s", rephrased_query)
+
+    if input_hash is not None:
+        _cache_rephrase(input_hash, rephrased_query)
 
     return rephrased_query
 
@@ -193,11 +271,11 @@ def thread_based_query_rephrase(
         return user_query
 
     if llm is None:
-        try:
-            llm, _ = get_default_llms()
-        except GenAIDisabledException:
+        default_llms = _get_default_llms_cached()
+        if default_llms is None:
             # If Generative AI is turned off, just return the original query
             return user_query
+        llm, _ = default_llms
 
     filled_llm_prompt = get_contextual_rephrase_messages(
         question=user_query, history_str=history_str, note=None
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Query, Depends
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
-import io
+from openpyxl.utils import get_column_letter
 import datetime
+import tempfile
 
-from typing import Tuple, List, Dict, Any
+from typing import IO, Iterator, Tuple, List, Dict, Any
 
 from onyx.auth.users import current_admin_user
 from onyx.db.engine import get_session
@@ -22,6 +24,62 @@ from onyx.db.analytics import (
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+_MAX_COLUMN_WIDTH = 50
+_REPORT_SPOOL_MAX_SIZE = 10 * 1024 * 1024
+_REPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_file_chunks(file: IO[bytes]) -> Iterator[bytes]:
+    try:
+        while chunk := file.read(_REPORT_CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+def _write_report_sheet(
+    workbook: Workbook,
+    title: str,
+    headers: List[str],
+    rows: List[Tuple[Any, ...]],
+    empty_message: str,
+) -> None:
+    """Append one report sheet to a write-only workbook: styled header row, data rows
+    and column widths auto-sized to the longest value (capped at _MAX_COLUMN_WIDTH)."""
+    sheet = workbook.create_sheet(title=title)
+
+    if not rows:
+        sheet.append([empty_message])
+        return
+
+    # Write-only sheets emit column settings before the first row, so widths are
+    # computed up front in one pass over the plain values
+    col_max_len = [len(str(header)) for header in headers]
+    for row in rows:
+        for i, value in enumerate(row):
+            if value:
+                col_max_len[i] = max(col_max_len[i], len(str(value)))
+    for i, max_length in enumerate(col_max_len):
+        sheet.column_dimensions[get_column_letter(i + 1)].width = min(
+            max_length + 2, _MAX_COLUMN_WIDTH
+        )
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.font = _HEADER_FONT
+        cell.fill = _HEADER_FILL
+        cell.alignment = _HEADER_ALIGNMENT
+        header_cells.append(cell)
+    sheet.append(header_cells)
+
+    for row in rows:
+        sheet.append(row)
+
+
 @router.get("")
 def get_analytics(
     start: str = Query(...),
@@ -65,70 +123,39 @@ def generate_analytics_report(
     """
     start_dt, end_dt = parse_date_range(start, end)
 
-    # Fetch datasets for the report using the new pivoted function
-    user_data = fetch_user_assistant_usage(db_session, start_dt, end_dt)
-    kb_data = fetch_kb_assistant_usage(db_session, start_dt, end_dt)
-
-    # Create Excel workbook
-    workbook = Workbook()
-
-    # --- Sheet 1: User Assistant Usage ---
-    ws1 = workbook.active
-    ws1.title = "User Assistant Usage"
-
-    if not user_data:
-        ws1.append(["No user data available for the selected period."])
-    else:
-        headers = list(user_data[0].keys())
-        ws1.append(headers)
-
-        for row in user_data:
-            ws1.append([row.get(header, "") for header in headers])
-
-    # --- Sheet 2: KB Assistant Usage ---
-    ws2 = workbook.create_sheet(title="KB Assistant Usage")
-
-    if not kb_data:
-        ws2.append(["No KB data available for the selected period."])
-    else:
-        headers = list(kb_data[0].keys())
-        ws2.append(headers)
-
-        for row in kb_data:
-            ws2.append([row.get(header, "") for header in headers])
-
-    # --- Formatting ---
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-
-    def format_sheet(sheet, data):
-        if not data:
-            return
-        # Format header row
-        for cell in sheet[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-        # Auto-adjust column widths
-        for column in sheet.columns:
-            max_length = max((len(str(cell.value)) for cell in column if cell.value), default=0)
-            adjusted_width = min(max_length + 2, 50)
-            sheet.column_dimensions[column[0].column_letter].width = adjusted_width
-
-    format_sheet(ws1, user_data)
-    format_sheet(ws2, kb_data)
-
-    # --- Save to BytesIO stream ---
-    stream = io.BytesIO()
-    workbook.save(stream)
-    stream.seek(0)
+    # Fetch datasets for the report as header-ordered row tuples
+    user_headers, user_rows = fetch_user_assistant_usage(db_session, start_dt, end_dt)
+    kb_headers, kb_rows = fetch_kb_assistant_usage(db_session, start_dt, end_dt)
+
+    # Write-only workbook: rows are serialized as they are appended instead of
+    # being kept around as Cell objects until save
+    workbook = Workbook(write_only=True)
+
+    _write_report_sheet(
+        workbook,
+        "User Assistant Usage",
+        user_headers,
+        user_rows,
+        "No user data available for the selected period.",
+    )
+    _write_report_sheet(
+        workbook,
+        "KB Assistant Usage",
+        kb_headers,
+        kb_rows,
+        "No KB data available for the selected period.",
+    )
+
+    # Spool the finished file (RAM up to a threshold, disk beyond) and stream it out in chunks
+    spooled_file = tempfile.SpooledTemporaryFile(max_size=_REPORT_SPOOL_MAX_SIZE)
+    workbook.save(spooled_file)
+    spooled_file.seek(0)
 
     filename = f"astra_assistant_report_{start}_to_{end}.xlsx"
     headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
 
     return StreamingResponse(
-        stream,
+        _iter_file_chunks(spooled_file),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers=headers,
     )
\ No newline at end of file
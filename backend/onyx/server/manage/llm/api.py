@@ -22,6 +22,7 @@ from onyx.llm.llm_provider_options import fetch_available_well_known_llms
 from onyx.llm.llm_provider_options import WellKnownLLMProviderDescriptor
 from onyx.llm.utils import litellm_exception_to_error_msg
 from onyx.llm.utils import test_llm
+from onyx.secondary_llm_flows.query_expansion import clear_default_llms_cache
 from onyx.server.manage.llm.models import FullLLMProvider
 from onyx.server.manage.llm.models import LLMProviderDescriptor
 from onyx.server.manage.llm.models import LLMProviderUpsertRequest
@@ -159,10 +160,12 @@ def put_llm_provider(
             )
 
     try:
-        return upsert_llm_provider(
+        upserted_provider = upsert_llm_provider(
             llm_provider=llm_provider,
             db_session=db_session,
         )
+        clear_default_llms_cache()
+        return upserted_provider
     except ValueError as e:
         logger.exception("Failed to upsert LLM Provider")
         raise HTTPException(status_code=400, detail=str(e))
@@ -175,6 +178,7 @@ def delete_llm_provider(
     db_session: Session = Depends(get_session),
 ) -> None:
     remove_llm_provider(db_session, provider_id)
+    clear_default_llms_cache()
 
 
 @admin_router.post("/provider/{provider_id}/default")
@@ -184,6 +188,7 @@ def set_provider_as_default(
     db_session: Session = Depends(get_session),
 ) -> None:
     update_default_provider(provider_id=provider_id, db_session=db_session)
+    clear_default_llms_cache()
 
 
 """Endpoints for all"""
@@ -6,8 +6,12 @@ from fastapi import APIRouter
 from fastapi import Body
 from fastapi import Depends
 from fastapi import HTTPException
+from fastapi import Query
 from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic import TypeAdapter
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from onyx.auth.users import current_admin_user, current_user
@@ -25,32 +29,40 @@ class PlatformEmailCreate(BaseModel):
 
 
 class PlatformEmailResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     email: str
     created_at: datetime
     updated_at: datetime
 
 
+_PLATFORM_EMAIL_LIST_ADAPTER = TypeAdapter(list[PlatformEmailResponse])
+
+
+def _fetch_platform_emails(
+    db_session: Session, limit: int, offset: int
+) -> list[PlatformEmailResponse]:
+    stmt = (
+        select(PlatformEmail)
+        .order_by(PlatformEmail.created_at.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    platform_emails = db_session.execute(stmt).scalars().all()
+    return _PLATFORM_EMAIL_LIST_ADAPTER.validate_python(platform_emails)
+
+
 @router.get("/platform-emails")
 def list_platform_emails_public(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     _: User = Depends(current_user),
     db_session: Session = Depends(get_session),
 ) -> list[PlatformEmailResponse]:
     """Get all platform emails (public endpoint)"""
     try:
-        stmt = select(PlatformEmail).order_by(PlatformEmail.created_at.desc())
-        result = db_session.execute(stmt)
-        platform_emails = result.scalars().all()
-        
-        return [
-            PlatformEmailResponse(
-                id=email.id,
-                email=email.email,
-                created_at=email.created_at,
-                updated_at=email.updated_at,
-            )
-            for email in platform_emails
-        ]
+        return _fetch_platform_emails(db_session, limit, offset)
     except Exception as e:
         logger.error(f"Error fetching platform emails: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch platform emails")
@@ -59,24 +71,14 @@ def list_platform_emails_public(
 # private endpoint for admin users
 @router.get("/manage/platform-emails")
 def list_platform_emails(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
     _: User = Depends(current_admin_user),
     db_session: Session = Depends(get_session),
 ) -> list[PlatformEmailResponse]:
     """Get all platform emails"""
     try:
-        stmt = select(PlatformEmail).order_by(PlatformEmail.created_at.desc())
-        result = db_session.execute(stmt)
-        platform_emails = result.scalars().all()
-        
-        return [
-            PlatformEmailResponse(
-                id=email.id,
-                email=email.email,
-                created_at=email.created_at,
-                updated_at=email.updated_at,
-            )
-            for email in platform_emails
-        ]
+        return _fetch_platform_emails(db_session, limit, offset)
     except Exception as e:
         logger.error(f"Error fetching platform emails: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch platform emails")
@@ -96,26 +98,25 @@ def create_platform_email(
         except EmailNotValidError:
             raise HTTPException(status_code=400, detail="Invalid email format")
         
-        # Check if email already exists
-        existing_email = db_session.execute(
-            select(PlatformEmail).where(PlatformEmail.email == email_data.email)
-        ).scalar_one_or_none()
-        
-        if existing_email:
+        # Single round-trip insert; the unique constraint on email decides existence,
+        # which also closes the race between concurrent creates of the same address
+        insert_stmt = (
+            insert(PlatformEmail)
+            .values(email=email_data.email)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(PlatformEmail)
+        )
+        platform_email = db_session.execute(insert_stmt).scalar_one_or_none()
+
+        if platform_email is None:
+            db_session.rollback()
             raise HTTPException(status_code=409, detail="Email already exists")
-        
-        # Create new platform email
-        platform_email = PlatformEmail(email=email_data.email)
-        db_session.add(platform_email)
+
+        # build the response from the RETURNING row before commit expires the instance
+        response = PlatformEmailResponse.model_validate(platform_email)
         db_session.commit()
-        db_session.refresh(platform_email)
-        
-        return PlatformEmailResponse(
-            id=platform_email.id,
-            email=platform_email.email,
-            created_at=platform_email.created_at,
-            updated_at=platform_email.updated_at,
-        )
+
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -65,23 +65,137 @@ def store_settings(settings: Settings) -> None:
 
     get_kv_store().store(KV_SETTINGS_KEY, settings.model_dump())
 
+import threading
+import time
+
+from redis.client import Redis
+from redis.exceptions import RedisError
+
 from onyx.configs.app_configs import DISABLE_USER_KNOWLEDGE
 from onyx.configs.app_configs import ONYX_QUERY_HISTORY_TYPE
+from onyx.configs.app_configs import SETTINGS_CACHE_TTL
 from onyx.configs.app_configs import SHOW_EXTRA_CONNECTORS
 from onyx.configs.constants import KV_SETTINGS_KEY
 from onyx.configs.constants import OnyxRedisLocks
 from onyx.key_value_store.factory import get_kv_store
 from onyx.key_value_store.interface import KvKeyNotFoundError
+from onyx.redis.redis_pool import get_raw_redis_client
 from onyx.redis.redis_pool import get_redis_client
 from onyx.server.settings.models import Settings
 from onyx.utils.logger import setup_logger
-from shared_configs.configs import MULTI_TENANT
 from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+_ANONYMOUS_USER_ENABLED_KEY = OnyxRedisLocks.ANONYMOUS_USER_ENABLED
+
+# clients share one connection pool, so a client per tenant is all we need
+_REDIS_CLIENTS: dict[str, Redis] = {}
+
+# tenant_id -> (monotonic time loaded, settings)
+_SETTINGS_CACHE: dict[str, tuple[float, Settings]] = {}
+_SETTINGS_CACHE_LOCK = threading.Lock()
+
+# published (unprefixed, on the raw client) with the tenant id as payload whenever
+# settings are stored, so every process can drop its cached copy right away
+_SETTINGS_INVALIDATION_CHANNEL = "onyx:settings:invalidate"
+_SETTINGS_INVALIDATION_RETRY_SECONDS = 5
+_settings_invalidation_listener: threading.Thread | None = None
+
+
+def _get_cached_settings(tenant_id: str) -> Settings | None:
+    if SETTINGS_CACHE_TTL <= 0:
+        return None
+    with _SETTINGS_CACHE_LOCK:
+        cached = _SETTINGS_CACHE.get(tenant_id)
+    if cached is None or time.monotonic() - cached[0] >= SETTINGS_CACHE_TTL:
+        return None
+    # callers commonly mutate the loaded settings before storing them back
+    return cached[1].model_copy()
+
+
+def _set_cached_settings(tenant_id: str, settings: Settings) -> None:
+    if SETTINGS_CACHE_TTL <= 0:
+        return
+    _ensure_settings_invalidation_listener()
+    with _SETTINGS_CACHE_LOCK:
+        _SETTINGS_CACHE[tenant_id] = (time.monotonic(), settings.model_copy())
+
+
+def invalidate_settings_cache(tenant_id: str) -> None:
+    with _SETTINGS_CACHE_LOCK:
+        _SETTINGS_CACHE.pop(tenant_id, None)
+
+
+def _listen_for_settings_invalidations() -> None:
+    while True:
+        try:
+            pubsub = get_raw_redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_SETTINGS_INVALIDATION_CHANNEL)
+            for message in pubsub.listen():
+                invalidate_settings_cache(message["data"].decode("utf-8"))
+        except Exception:
+            # cached settings still expire after SETTINGS_CACHE_TTL, so just retry
+            logger.exception("Settings invalidation listener failed, retrying")
+            time.sleep(_SETTINGS_INVALIDATION_RETRY_SECONDS)
+
+
+def _ensure_settings_invalidation_listener() -> None:
+    global _settings_invalidation_listener
+
+    if _settings_invalidation_listener is not None:
+        return
+    with _SETTINGS_CACHE_LOCK:
+        if _settings_invalidation_listener is not None:
+            return
+        _settings_invalidation_listener = threading.Thread(
+            target=_listen_for_settings_invalidations,
+            name="settings-invalidation-listener",
+            daemon=True,
+        )
+        _settings_invalidation_listener.start()
+
+
+def _redis_client_for(tenant_id: str) -> Redis:
+    client = _REDIS_CLIENTS.get(tenant_id)
+    if client is None:
+        client = _REDIS_CLIENTS[tenant_id] = get_redis_client(tenant_id=tenant_id)
+    return client
+
+
+def _parse_redis_flag(value: bytes | None, default: bool = False) -> bool:
+    # flags are stored as b"0" / b"1", compare the raw bytes instead of decoding
+    if value is None:
+        return default
+    return value == b"1"
+
+
+def initialize_settings_defaults(tenant_id: str | None = None) -> None:
+    """Install default values for the Redis-backed settings flags without
+    overwriting anything already set, so reads never have to write back."""
+    redis_client = _redis_client_for(tenant_id or get_current_tenant_id())
+    redis_client.set(_ANONYMOUS_USER_ENABLED_KEY, b"0", nx=True)
+
+
+def _load_anonymous_user_flag(tenant_id: str) -> bool:
+    try:
+        # the default is installed by initialize_settings_defaults at setup time,
+        # a missing key simply reads as disabled
+        return _parse_redis_flag(
+            _redis_client_for(tenant_id).get(_ANONYMOUS_USER_ENABLED_KEY)
+        )
+    except RedisError as e:
+        # Log the error and reset to default
+        logger.error("Error loading anonymous user setting from Redis: %s", e)
+        return False
+
 
 def load_settings() -> Settings:
+    tenant_id = get_current_tenant_id()
+    cached_settings = _get_cached_settings(tenant_id)
+    if cached_settings is not None:
+        return cached_settings
+
     kv_store = get_kv_store()
     try:
         stored_settings = kv_store.load(KV_SETTINGS_KEY)
@@ -96,25 +210,10 @@ def load_settings() -> Settings:
         logger.error(f"Error loading settings from KV store: {str(e)}")
         settings = Settings()
 
-    tenant_id = get_current_tenant_id() if MULTI_TENANT else None
-    redis_client = get_redis_client(tenant_id=tenant_id)
-
-    try:
-        value = redis_client.get(OnyxRedisLocks.ANONYMOUS_USER_ENABLED)
-        if value is not None:
-            assert isinstance(value, bytes)
-            anonymous_user_enabled = int(value.decode("utf-8")) == 1
-        else:
-            # Default to False
-            anonymous_user_enabled = False
-            # Optionally store the default back to Redis
-            redis_client.set(OnyxRedisLocks.ANONYMOUS_USER_ENABLED, "0")
-    except Exception as e:
-        # Log the error and reset to default
-        logger.error(f"Error loading anonymous user setting from Redis: {str(e)}")
-        anonymous_user_enabled = False
-
-    settings.anonymous_user_enabled = anonymous_user_enabled
+    # the KV store is the source of truth, the Redis flag is only a write-through
+    # copy for auth. Settings stored before that have no value, so fall back once.
+    if settings.anonymous_user_enabled is None:
+        settings.anonymous_user_enabled = _load_anonymous_user_flag(tenant_id)
     settings.query_history_type = ONYX_QUERY_HISTORY_TYPE
 
     # Override user knowledge setting if disabled via environment variable
@@ -122,17 +221,32 @@ def load_settings() -> Settings:
         settings.user_knowledge_enabled = False
 
     settings.show_extra_connectors = SHOW_EXTRA_CONNECTORS
+
+    _set_cached_settings(tenant_id, settings)
     return settings
 
 
 def store_settings(settings: Settings) -> None:
-    tenant_id = get_current_tenant_id() if MULTI_TENANT else None
-    redis_client = get_redis_client(tenant_id=tenant_id)
+    tenant_id = get_current_tenant_id()
+    # serialize once, the payload is patched and stored as-is below
+    payload = settings.model_dump()
+    anonymous_user_enabled = settings.anonymous_user_enabled
+    if anonymous_user_enabled is None:
+        # keep the current value rather than persisting an unset flag
+        anonymous_user_enabled = load_settings().anonymous_user_enabled
+        payload["anonymous_user_enabled"] = anonymous_user_enabled
+
+    # auth reads the flag straight from Redis (see anonymous_user_enabled), so write
+    # it through. NOTE: a single SET, and TenantRedis only prefixes keys on direct
+    # client calls (not on pipeline()), so there is nothing to gain from pipelining
+    _redis_client_for(tenant_id).set(
+        _ANONYMOUS_USER_ENABLED_KEY,
+        b"1" if anonymous_user_enabled else b"0",
+    )
 
-    if settings.anonymous_user_enabled is not None:
-        redis_client.set(
-            OnyxRedisLocks.ANONYMOUS_USER_ENABLED,
-            "1" if settings.anonymous_user_enabled else "0",
-        )
+    get_kv_store().store(KV_SETTINGS_KEY, payload)
 
-    get_kv_store().store(KV_SETTINGS_KEY, settings.model_dump())
+    invalidate_settings_cache(tenant_id)
+    # NOTE: the flag SET above goes through the tenant-prefixing client while the
+    # channel is global, so the publish can't share a pipeline with it
+    get_raw_redis_client().publish(_SETTINGS_INVALIDATION_CHANNEL, tenant_id)
@@ -42,6 +42,7 @@ from onyx.natural_language_processing.search_nlp_models import warm_up_cross_enc
 from onyx.seeding.load_docs import seed_initial_documents
 from onyx.seeding.load_yamls import load_chat_yamls
 from onyx.server.manage.llm.models import LLMProviderUpsertRequest
+from onyx.server.settings.store import initialize_settings_defaults
 from onyx.server.settings.store import load_settings
 from onyx.server.settings.store import store_settings
 from onyx.tools.built_in_tools import auto_add_search_tool_to_personas
@@ -111,6 +112,8 @@ def setup_onyx(
     # setup Postgres with default credential, llm providers, etc.
     setup_postgres(db_session)
 
+    initialize_settings_defaults(tenant_id)
+
     translate_saved_search_settings(db_session)
 
     # Does the user need to trigger a reindexing to bring the document index
@@ -1,20 +1,32 @@
 import csv
+import hashlib
 import json
+import logging
+import re
+import threading
 import uuid
 from collections.abc import Generator
+from collections.abc import Iterator
+from functools import lru_cache
 from io import BytesIO
 from io import StringIO
+from itertools import islice
 from typing import Any
 from typing import cast
 from typing import Dict
+from typing import IO
 from typing import List
 
+import orjson
 import requests
 from onyx.chat.models import PromptConfig
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 from pydantic import BaseModel
-from requests import JSONDecodeError
+from sqlalchemy.orm import Session
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 from litellm.exceptions import ContextWindowExceededError
 
 from onyx.chat.models import PromptConfig
@@ -77,6 +89,127 @@ logger = setup_logger()
 CUSTOM_TOOL_RESPONSE_ID = "custom_tool_response"
 REQUEST_BODY = "request_body"
 
+# LLM output wrapped in a markdown code fence, optionally tagged as json
+_CODE_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+_HTTP_POOL_CONNECTIONS = 32
+_HTTP_POOL_MAXSIZE = 64
+
+
+def _build_http_session() -> requests.Session:
+    # urllib3 only retries idempotent methods by default, so POSTs are never replayed.
+    # raise_on_status=False hands the last 5xx back to the tool like before.
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=_HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# shared across tools so keep-alive connections (and TLS sessions) are reused between
+# calls; auth and headers stay per-request since they differ between tools
+_HTTP_SESSION = _build_http_session()
+
+# orjson silently turns integers that don't fit in 64 bits (19+ digits) into floats
+_LONG_INT_RE = re.compile(rb"\d{19}")
+
+
+def _load_json_response(response: requests.Response) -> Any:
+    """Decodes a JSON body with orjson. Bodies orjson rejects or can't represent
+    exactly (non UTF-8 encodings, NaN/Infinity, integers beyond 64 bits) go through
+    response.json() instead. Raises json.JSONDecodeError if the body isn't JSON"""
+    content = response.content
+    if not _LONG_INT_RE.search(content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return response.json()
+
+
+@lru_cache(maxsize=256)
+def _render_dated_tool_prompt(
+    prompt: str, system_prompt: str, task_prompt: str, current_minute: str
+) -> str:
+    # The rendered prompt embeds the current time down to the minute, so the
+    # cache key carries the minute it was rendered in. handle_onyx_date_awareness
+    # only reads the system/task prompts off the config.
+    prompt_config = PromptConfig.model_construct(
+        system_prompt=system_prompt, task_prompt=task_prompt
+    )
+    return handle_onyx_date_awareness(prompt, prompt_config, True)
+
+
+_FRESHDESK_SEARCH = "search"
+_FRESHDESK_TICKET = "ticket"
+_FRESHDESK_LIST = "list"
+_FRESHDESK_OTHER = "other"
+
+
+def _classify_freshdesk_endpoint(url_template: str) -> str | None:
+    """Returns which Freshdesk handler serves this endpoint, None if it is not Freshdesk."""
+    if "seclore.freshdesk.com" not in url_template:
+        return None
+    if "/search/tickets" in url_template:
+        return _FRESHDESK_SEARCH
+    if "/tickets/" in url_template:
+        # falls back to listing at call time if no ticket_id is given
+        return _FRESHDESK_TICKET
+    if "/tickets" in url_template:
+        return _FRESHDESK_LIST
+    return _FRESHDESK_OTHER
+
+
+_NO_PAGE_METADATA: dict[str, str] = {}
+
+
+def _freshdesk_ticket_to_llm_doc(
+    ticket: dict[str, Any],
+    index: int,
+    updated_at: datetime,
+    page_metadata: dict[str, str] | None = None,
+) -> LlmDoc:
+    ticket_id = ticket.get("id")
+    display_id = "N/A" if ticket_id is None else ticket_id
+    subject = ticket.get("subject")
+    link = ticket.get("link", "")
+
+    metadata = {
+        "ticket_id": "" if ticket_id is None else str(ticket_id),
+        "subject": "" if subject is None else subject,
+        "status": str(ticket.get("status", "")),
+        "priority": str(ticket.get("priority", "")),
+        "created_at": ticket.get("created_at", ""),
+        "updated_at": ticket.get("updated_at", ""),
+        "source": "Freshdesk API",
+        # page-level values are built once per page by the caller and splatted in
+        **(page_metadata or _NO_PAGE_METADATA),
+    }
+
+    return LlmDoc(
+        document_id=f"freshdesk_ticket_{index if ticket_id is None else ticket_id}",
+        # compact JSON: cheaper to serialize and fewer prompt tokens than indent=2
+        content=orjson.dumps(ticket).decode(),
+        blurb=f"Ticket #{display_id}: {'No subject' if subject is None else subject}",
+        semantic_identifier=f"Freshdesk Ticket #{display_id}",
+        source_type=DocumentSource.FRESHDESK,
+        metadata=metadata,
+        updated_at=updated_at,
+        link=link,
+        source_links={index: link} if link else None,
+        match_highlights=None,
+    )
+
 
 class CustomToolFileResponse(BaseModel):
     file_ids: List[str]  # References to saved images or CSVs
@@ -101,20 +234,41 @@ class CustomTool(BaseTool):
         self._base_url = base_url
         self._method_spec = method_spec
         self._tool_definition = self._method_spec.to_tool_definition()
+        self._tool_parameters = self._tool_definition["function"]["parameters"]
+        # the spec never changes for a tool, so resolve its parameter names once
+        self._path_param_names = tuple(
+            schema["name"] for schema in method_spec.get_path_param_schemas()
+        )
+        self._query_param_names = tuple(
+            schema["name"] for schema in method_spec.get_query_param_schemas()
+        )
         self._user_oauth_token = user_oauth_token
 
         self._name = self._method_spec.name
         self._description = self._method_spec.summary
-        self.headers = (
-            header_list_to_header_dict(custom_headers) if custom_headers else {}
+        # case-insensitive so the OAuth token replaces an "AUTHORIZATION" header too
+        self.headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(
+            header_list_to_header_dict(custom_headers) if custom_headers else None
         )
         self.answer_style_config = answer_style_config
         self.prompt_config = prompt_config
 
-        # Check for both Authorization header and OAuth token
-        has_auth_header = any(
-            key.lower() == "authorization" for key in self.headers.keys()
+        # the endpoint is fixed per tool, so decide how Freshdesk calls are handled once
+        self._freshdesk_endpoint = _classify_freshdesk_endpoint(
+            f"{base_url}{method_spec.path}"
         )
+        self._freshdesk_utils = (
+            FreshdeskUtils(
+                domain=FRESHDESK_API_DOMAIN,
+                api_key=FRESHDESK_API_KEY,
+                password=FRESHDESK_API_PASSWORD,
+            )
+            if self._freshdesk_endpoint is not None
+            else None
+        )
+
+        # Check for both Authorization header and OAuth token
+        has_auth_header = "Authorization" in self.headers
         if has_auth_header and self._user_oauth_token:
             logger.warning(
                 f"Tool '{self._name}' has both an Authorization "
@@ -140,7 +294,7 @@ class CustomTool(BaseTool):
     """For LLMs which support explicit tool calling"""
 
     def tool_definition(self) -> dict:
-        logger.info(f"tool_definition description: {self._tool_definition}")
+        logger.debug("tool_definition description: %s", self._tool_definition)
         return self._tool_definition
 
     def build_tool_message_content(
@@ -150,10 +304,12 @@ class CustomTool(BaseTool):
 
         if response.response_type == "image" or response.response_type == "csv":
             image_response = cast(CustomToolFileResponse, response.tool_result)
-            return json.dumps({"file_ids": image_response.file_ids})
+            return orjson.dumps({"file_ids": image_response.file_ids}).decode()
 
         # For JSON or other responses, return as-is
-        return json.dumps(response.tool_result)
+        return orjson.dumps(
+            response.tool_result, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
 
     def _truncate_history_for_tool_prompt(self, history: list[PreviousMessage]) -> str:
         """Truncate conversation history to prevent context window exceeded errors.
@@ -167,15 +323,12 @@ class CustomTool(BaseTool):
         # Use a conservative limit for custom tool prompts
         # Limit to last 10 messages to prevent context window issues
         max_messages = 10
-        limited_history = history[-max_messages:] if len(history) > max_messages else history
-        
+
         # Convert to simple string format
-        history_str = ""
-        for message in limited_history:
-            role = message.message_type.value.upper()
-            history_str += f"{role}:\n{message.message}\n\n"
-        
-        return history_str.strip()
+        return "\n\n".join(
+            f"{message.message_type.value.upper()}:\n{message.message}"
+            for message in history[-max_messages:]
+        ).rstrip()
 
     """For LLMs which do NOT support explicit tool calling"""
 
@@ -220,9 +373,18 @@ class CustomTool(BaseTool):
                 # If we can't determine, assume we should use the tool
                 pass
 
+        # nothing for the LLM to fill in, skip the argument call entirely
+        if not self._tool_parameters.get("properties"):
+            return {}
+
         content = ""
         custom_tool_system_prompt = getattr(prompt_config, 'custom_tool_argument_system_prompt', None) or TOOL_ARG_SYSTEM_PROMPT
-        custom_tool_system_prompt = handle_onyx_date_awareness(custom_tool_system_prompt, prompt_config, True)
+        custom_tool_system_prompt = _render_dated_tool_prompt(
+            custom_tool_system_prompt,
+            prompt_config.system_prompt,
+            prompt_config.task_prompt,
+            datetime.now().strftime("%Y-%m-%d %H:%M"),
+        )
         logger.info(f"custom_tool_system_prompt: {custom_tool_system_prompt}")
         try:
             args_result = llm.invoke(   
@@ -234,7 +396,7 @@ class CustomTool(BaseTool):
                             query=query,
                             tool_name=self.name,
                             tool_description=self.description,
-                            tool_args=self.tool_definition()["function"]["parameters"],
+                            tool_args=self._tool_parameters,
                         )
                     ),
                 ]
@@ -250,132 +412,143 @@ class CustomTool(BaseTool):
             # Return a basic response if we can't get arguments
             return {"query": query}
         
+        fence_match = _CODE_FENCE_RE.match(args_result_str)
+        payload = fence_match.group(1) if fence_match else args_result_str.strip()
         try:
-            return json.loads(args_result_str.strip())
+            return json.loads(payload)
         except json.JSONDecodeError:
-            pass
-
-        # try removing ```
-        try:
-            return json.loads(args_result_str.strip("```"))
-        except json.JSONDecodeError:
-            pass
-
-        # try removing ```json
-        try:
-            return json.loads(args_result_str.strip("```").strip("json"))
-        except json.JSONDecodeError:
-            pass
-
-        # pretend like nothing happened if not parse-able
-        logger.error(
-            f"Failed to parse args for '{self.name}' tool. Recieved: {args_result_str}"
-        )
-        return None
+            # pretend like nothing happened if not parse-able
+            logger.error(
+                f"Failed to parse args for '{self.name}' tool. Recieved: {args_result_str}"
+            )
+            return None
 
     def _save_and_get_file_references(
-        self, file_content: bytes | str, content_type: str
+        self,
+        file_content: bytes | str | IO[bytes],
+        content_type: str,
+        db_session: Session | None = None,
     ) -> List[str]:
-        with get_session_with_default_tenant() as db_session:
-            file_store = get_default_file_store(db_session)
+        if db_session is None:
+            with get_session_with_default_tenant() as db_session:
+                return self._save_and_get_file_references(
+                    file_content, content_type, db_session
+                )
 
-            file_id = str(uuid.uuid4())
+        file_store = get_default_file_store(db_session)
 
-            # Handle both binary and text content
-            if isinstance(file_content, str):
-                content = BytesIO(file_content.encode())
-            else:
-                content = BytesIO(file_content)
-
-            file_store.save_file(
-                file_name=file_id,
-                content=content,
-                display_name=file_id,
-                file_origin=FileOrigin.CHAT_UPLOAD,
-                file_type=content_type,
-                file_metadata={
-                    "content_type": content_type,
-                },
-            )
+        file_id = str(uuid.uuid4())
+
+        # Handle text, binary and file-like (e.g. a streamed response body) content
+        content: IO[bytes]
+        if isinstance(file_content, str):
+            content = BytesIO(file_content.encode())
+        elif isinstance(file_content, bytes):
+            content = BytesIO(file_content)
+        else:
+            content = file_content
+
+        file_store.save_file(
+            file_name=file_id,
+            content=content,
+            display_name=file_id,
+            file_origin=FileOrigin.CHAT_UPLOAD,
+            file_type=content_type,
+            file_metadata={
+                "content_type": content_type,
+            },
+        )
 
         return [file_id]
 
-    def _parse_csv(self, csv_text: str) -> List[Dict[str, Any]]:
-        csv_file = StringIO(csv_text)
-        reader = csv.DictReader(csv_file)
-        return [row for row in reader]
+    def _save_response_body(
+        self,
+        response: requests.Response,
+        content_type: str,
+        db_session: Session | None = None,
+    ) -> List[str]:
+        # hand the socket stream (gzip-decoded on the fly) to the file store rather
+        # than buffering it into response.content and copying it into a BytesIO
+        try:
+            response.raw.decode_content = True
+            return self._save_and_get_file_references(
+                response.raw, content_type, db_session
+            )
+        finally:
+            response.close()
+
+    def _parse_csv(self, csv_text: str) -> Iterator[Dict[str, Any]]:
+        # rows are yielded lazily so large exports are never held as a list of dicts
+        return csv.DictReader(StringIO(csv_text))
 
     """Actual execution of the tool"""
 
     def run(self, **kwargs: Any) -> Generator[ToolResponse, None, None]:
         request_body = kwargs.get(REQUEST_BODY)
 
-        path_params = {}
-
-        for path_param_schema in self._method_spec.get_path_param_schemas():
-            path_params[path_param_schema["name"]] = kwargs[path_param_schema["name"]]
+        path_params = {name: kwargs[name] for name in self._path_param_names}
 
-        logger.info(f"kwargs path params: {path_params}")
-        query_params = {}
-        for query_param_schema in self._method_spec.get_query_param_schemas():
-            if query_param_schema["name"] in kwargs:
-                query_params[query_param_schema["name"]] = kwargs[
-                    query_param_schema["name"]
-                ]
+        logger.info("kwargs path params: %s", path_params)
+        query_params = {
+            name: kwargs[name] for name in self._query_param_names if name in kwargs
+        }
 
         url = self._method_spec.build_url(self._base_url, path_params, query_params)
         method = self._method_spec.method
-        logger.info(f"url: {url}")
-        logger.info(f"request_body: {request_body}")
-        logger.info(f"headers: {self.headers}")
+        logger.info("url: %s", url)
+        logger.info("request_body: %s", request_body)
+        logger.info("headers: %s", self.headers)
 
         # Initialize llm_docs for potential citation creation
         llm_docs = []
         
         # Handle Freshdesk API calls with custom logic
-        if "seclore.freshdesk.com" in url:
-            freshdesk_utils = FreshdeskUtils(
-                domain=FRESHDESK_API_DOMAIN,
-                api_key=FRESHDESK_API_KEY,
-                password=FRESHDESK_API_PASSWORD
-            )
-            
+        if self._freshdesk_endpoint is not None:
+            freshdesk_utils = cast(FreshdeskUtils, self._freshdesk_utils)
+            freshdesk_endpoint = self._freshdesk_endpoint
+            if freshdesk_endpoint == _FRESHDESK_TICKET and not path_params.get("ticket_id"):
+                freshdesk_endpoint = _FRESHDESK_LIST
+
             # Handle different Freshdesk endpoints
-            if "/search/tickets" in url:
+            if freshdesk_endpoint == _FRESHDESK_SEARCH:
                 # Search tickets endpoint
-                logger.info(f"query_params: {query_params}")
+                logger.info("query_params: %s", query_params)
                 tool_result = freshdesk_utils.search_tickets_custom_tool(**query_params)
                 response_type = "json"
-                logger.info(f"Freshdesk search tickets result type: {type(tool_result)}")
-                if isinstance(tool_result, dict):
-                    logger.info(f"Freshdesk search tickets result keys: {list(tool_result.keys())}")
-            elif "/tickets/" in url and path_params.get("ticket_id"):
+                logger.info("Freshdesk search tickets result type: %s", type(tool_result))
+                if isinstance(tool_result, dict) and logger.isEnabledFor(logging.INFO):
+                    logger.info("Freshdesk search tickets result keys: %s", list(tool_result.keys()))
+            elif freshdesk_endpoint == _FRESHDESK_TICKET:
                 # Get ticket details endpoint
                 ticket_id = path_params["ticket_id"]
                 tool_result = freshdesk_utils.get_ticket_details(ticket_id)
                 response_type = "json"
-                logger.info(f"Freshdesk ticket details result type: {type(tool_result)}")
-                if isinstance(tool_result, dict):
-                    logger.info(f"Freshdesk ticket details result keys: {list(tool_result.keys())}")
-            elif "/tickets" in url:
+                logger.info("Freshdesk ticket details result type: %s", type(tool_result))
+                if isinstance(tool_result, dict) and logger.isEnabledFor(logging.INFO):
+                    logger.info("Freshdesk ticket details result keys: %s", list(tool_result.keys()))
+            elif freshdesk_endpoint == _FRESHDESK_LIST:
                 # List tickets endpoint (this is what's being called)
                 tool_result = freshdesk_utils.search_tickets_custom_tool(**query_params)
                 response_type = "json"
-                logger.info(f"Freshdesk list tickets result type: {type(tool_result)}")
-                if isinstance(tool_result, dict):
-                    logger.info(f"Freshdesk list tickets result keys: {list(tool_result.keys())}")
+                logger.info("Freshdesk list tickets result type: %s", type(tool_result))
+                if isinstance(tool_result, dict) and logger.isEnabledFor(logging.INFO):
+                    logger.info("Freshdesk list tickets result keys: %s", list(tool_result.keys()))
             else:
                 # Fallback to regular API call for other endpoints
                 auth = (FRESHDESK_API_KEY, FRESHDESK_API_PASSWORD)
-                response = requests.request(
+                response = _HTTP_SESSION.request(
                     method, url, json=request_body, headers=self.headers, auth=auth
                 )
-                logger.info(f"response: {response}")
+                logger.info("response: %s", response)
                 content_type = response.headers.get("Content-Type", "")
                 
                 if "application/json" in content_type:
-                    tool_result = response.json()
-                    response_type = "json"
+                    try:
+                        tool_result = _load_json_response(response)
+                        response_type = "json"
+                    except json.JSONDecodeError:
+                        tool_result = response.text
+                        response_type = "text"
                 else:
                     tool_result = response.text
                     response_type = "text"
@@ -383,10 +556,11 @@ class CustomTool(BaseTool):
             # Create LlmDoc objects for Freshdesk API responses to enable citations
             # IMPORTANT: Only create LlmDoc objects for current page tickets to prevent context window issues
             # Previous page tickets from chat history will not be included in the context
-            logger.info(f"Creating LlmDoc objects for Freshdesk API response: {response_type}")
+            logger.info("Creating LlmDoc objects for Freshdesk API response: %s", response_type)
             if response_type == "json" and isinstance(tool_result, dict):
                 # Convert Freshdesk API response to LlmDoc objects
-                logger.info(f"Processing Freshdesk JSON response with keys: {list(tool_result.keys())}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Processing Freshdesk JSON response with keys: %s", list(tool_result.keys()))
                 
                 # Handle the new response format with "results" array
                 if "results" in tool_result:
@@ -401,105 +575,63 @@ class CustomTool(BaseTool):
                     previous_page = tool_result.get("previous_page")
                     summary = tool_result.get("summary", "")
                     
-                    logger.info(f"Found {len(tickets)} tickets in results array (page {current_page}/{total_pages}, total available: {total}, has_next: {has_next_page})")
+                    logger.info(
+                        "Found %d tickets in results array (page %s/%s, total available: %s, has_next: %s)",
+                        len(tickets), current_page, total_pages, total, has_next_page,
+                    )
                     
                     # Only create LlmDoc objects for current page tickets to prevent context window issues
                     # Previous page tickets from chat history will not be included
-                    for i, ticket in enumerate(tickets):
-                        doc_id = f"freshdesk_ticket_{ticket.get('id', i)}"
-                        content = json.dumps(ticket, indent=2)
-                        blurb = f"Ticket #{ticket.get('id', 'N/A')}: {ticket.get('subject', 'No subject')}"
-                        
-                        llm_doc = LlmDoc(
-                            document_id=doc_id,
-                            content=content,
-                            blurb=blurb,
-                            semantic_identifier=f"Freshdesk Ticket #{ticket.get('id', 'N/A')}",
-                            source_type=DocumentSource.FRESHDESK,
-                            metadata={
-                                "ticket_id": str(ticket.get('id', '')),
-                                "subject": ticket.get('subject', ''),
-                                "status": str(ticket.get('status', '')),
-                                "priority": str(ticket.get('priority', '')),
-                                "created_at": ticket.get('created_at', ''),
-                                "updated_at": ticket.get('updated_at', ''),
-                                "source": "Freshdesk API",
-                                "total_available": str(total),
-                                "current_page": str(current_page),
-                                "total_pages": str(total_pages),
-                                "has_next_page": str(has_next_page),
-                                "has_previous_page": str(has_previous_page),
-                                "next_page": str(next_page) if next_page is not None else "",
-                                "previous_page": str(previous_page) if previous_page is not None else "",
-                                "pagination_summary": summary
-                            },
-                            updated_at=datetime.now(),
-                            link=ticket.get('link', ''),
-                            source_links={i: ticket.get('link', '')} if ticket.get('link') else None,
-                            match_highlights=None
-                        )
-                        llm_docs.append(llm_doc)
-                        logger.info(f"Created LlmDoc for ticket {ticket.get('id', 'N/A')}: {doc_id}")
-                else:                                                        
+                    page_metadata = {
+                        "total_available": str(total),
+                        "current_page": str(current_page),
+                        "total_pages": str(total_pages),
+                        "has_next_page": str(has_next_page),
+                        "has_previous_page": str(has_previous_page),
+                        "next_page": str(next_page) if next_page is not None else "",
+                        "previous_page": str(previous_page) if previous_page is not None else "",
+                        "pagination_summary": summary,
+                    }
+                    now = datetime.now()
+                    llm_docs = [
+                        _freshdesk_ticket_to_llm_doc(ticket, i, now, page_metadata)
+                        for i, ticket in enumerate(tickets)
+                    ]
+                else:
                     # Only create LlmDoc objects for current page tickets to prevent context window issues
                     # Previous page tickets from chat history will not be included
-                    ticket = tool_result
-                    doc_id = f"freshdesk_ticket_{ticket.get('id', 0)}"
-                    content = json.dumps(ticket, indent=2)
-                    blurb = f"Ticket #{ticket.get('id', 'N/A')}: {ticket.get('subject', 'No subject')}"
-                    
-                    llm_doc = LlmDoc(
-                        document_id=doc_id,
-                        content=content,
-                        blurb=blurb,
-                        semantic_identifier=f"Freshdesk Ticket #{ticket.get('id', 'N/A')}",
-                        source_type=DocumentSource.FRESHDESK,
-                        metadata={
-                            "ticket_id": str(ticket.get('id', '')),
-                            "subject": ticket.get('subject', ''),
-                            "status": str(ticket.get('status', '')),
-                            "priority": str(ticket.get('priority', '')),
-                            "created_at": ticket.get('created_at', ''),
-                            "updated_at": ticket.get('updated_at', ''),
-                            "source": "Freshdesk API"
-                        },
-                        updated_at=datetime.now(),
-                        link=ticket.get('link', ''),
-                        source_links={0: ticket.get('link', '')} if ticket.get('link') else None,
-                        match_highlights=None
+                    llm_docs = [_freshdesk_ticket_to_llm_doc(tool_result, 0, datetime.now())]
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(
+                        "Created LlmDocs for tickets %s",
+                        [doc.metadata["ticket_id"] for doc in llm_docs],
                     )
-                    llm_docs.append(llm_doc)
-                    logger.info(f"Created LlmDoc for ticket {ticket.get('id', 'N/A')}: {doc_id}")
             
-            logger.info(f"Created {len(llm_docs)} LlmDoc objects for Freshdesk API response")
+            logger.info("Created %d LlmDoc objects for Freshdesk API response", len(llm_docs))
         else:
             # Regular API call for non-Freshdesk URLs
-            response = requests.request(
-                method, url, json=request_body, headers=self.headers
+            response = _HTTP_SESSION.request(
+                method, url, json=request_body, headers=self.headers, stream=True
             )
             
-            logger.info(f"response: {response}")
+            logger.info("response: %s", response)
             content_type = response.headers.get("Content-Type", "")
 
             tool_result: Any
             response_type: str
             if "text/csv" in content_type:
-                file_ids = self._save_and_get_file_references(
-                    response.content, content_type
-                )
+                file_ids = self._save_response_body(response, content_type)
                 tool_result = CustomToolFileResponse(file_ids=file_ids)
                 response_type = "csv"
             elif "image/" in content_type:
-                file_ids = self._save_and_get_file_references(
-                    response.content, content_type
-                )
+                file_ids = self._save_response_body(response, content_type)
                 tool_result = CustomToolFileResponse(file_ids=file_ids)
                 response_type = "image"
             elif "application/json" in content_type:
                 try:
-                    tool_result = response.json()
+                    tool_result = _load_json_response(response)
                     response_type = "json"
-                except JSONDecodeError:
+                except json.JSONDecodeError:
                     tool_result = response.text
                     response_type = "text"
             else:
@@ -518,9 +650,10 @@ class CustomTool(BaseTool):
         
         # Yield FINAL_CONTEXT_DOCUMENTS_ID response if LlmDoc objects were created
         if llm_docs:
-            logger.info(f"Yielding {len(llm_docs)} LlmDoc objects with FINAL_CONTEXT_DOCUMENTS_ID")
-            for doc in llm_docs:
-                logger.info(f"LlmDoc: {doc.document_id} - {doc.semantic_identifier}")
+            logger.info("Yielding %d LlmDoc objects with FINAL_CONTEXT_DOCUMENTS_ID", len(llm_docs))
+            if logger.isEnabledFor(logging.INFO):
+                for doc in llm_docs:
+                    logger.info("LlmDoc: %s - %s", doc.document_id, doc.semantic_identifier)
             yield ToolResponse(
                 id=FINAL_CONTEXT_DOCUMENTS_ID,
                 response=llm_docs
@@ -667,30 +800,122 @@ class CustomTool(BaseTool):
             return None
 
 
-def build_custom_tools_from_openapi_schema_and_headers(
+_COMPILED_SCHEMA_CACHE_SIZE = 256
+_compiled_schema_cache: dict[
+    tuple[bytes, Any, Any], tuple[str, tuple[MethodSpec, ...]]
+] = {}
+_compiled_schema_cache_lock = threading.Lock()
+# to tell from the serialized schema whether it depends on the chat session / message
+_CHAT_SESSION_ID_PLACEHOLDER_BYTES = CHAT_SESSION_ID_PLACEHOLDER.encode()
+_MESSAGE_ID_PLACEHOLDER_BYTES = MESSAGE_ID_PLACEHOLDER.encode()
+
+
+# all placeholders in one alternation so each string is scanned once
+_PLACEHOLDER_RE = re.compile(
+    "|".join(
+        re.escape(placeholder)
+        for placeholder in (CHAT_SESSION_ID_PLACEHOLDER, MESSAGE_ID_PLACEHOLDER)
+    )
+)
+
+
+def _substitute_placeholders(obj: Any, mapping: dict[str, str]) -> Any:
+    """Replaces placeholders in every string (keys included, since paths are keys)
+    of a JSON-like object. Containers are only copied when something inside them
+    changed, untouched subtrees are shared with the input."""
+    if isinstance(obj, str):
+        if not _PLACEHOLDER_RE.search(obj):
+            return obj
+        substituted = _PLACEHOLDER_RE.sub(
+            lambda match: mapping.get(match.group(0), match.group(0)), obj
+        )
+        return obj if substituted == obj else substituted
+
+    # copies are only started at the first changed entry, so the common case of a
+    # schema without placeholders walks it without allocating anything
+    if isinstance(obj, dict):
+        new_dict: dict[Any, Any] | None = None
+        for index, (key, value) in enumerate(obj.items()):
+            new_key = _substitute_placeholders(key, mapping)
+            new_value = _substitute_placeholders(value, mapping)
+            if new_dict is None and (new_key is not key or new_value is not value):
+                new_dict = dict(islice(obj.items(), index))
+            if new_dict is not None:
+                new_dict[new_key] = new_value
+        return obj if new_dict is None else new_dict
+
+    if isinstance(obj, list):
+        new_list: list[Any] | None = None
+        for index, item in enumerate(obj):
+            new_item = _substitute_placeholders(item, mapping)
+            if new_list is None and new_item is not item:
+                new_list = obj[:index]
+            if new_list is not None:
+                new_list.append(new_item)
+        return obj if new_list is None else new_list
+
+    return obj
+
+
+def _compile_openapi_schema(
     openapi_schema: dict[str, Any],
-    custom_headers: list[HeaderItemDict] | None = None,
-    dynamic_schema_info: DynamicSchemaInfo | None = None,
-    user_oauth_token: str | None = None,
-    answer_style_config: AnswerStyleConfig | None = None,
-    prompt_config: PromptConfig | None = None,
-) -> list[CustomTool]:
+    dynamic_schema_info: DynamicSchemaInfo | None,
+) -> tuple[str, tuple[MethodSpec, ...]]:
+    """Resolves placeholders and parses the schema into its base url and method specs.
+    Results are cached by schema content. Only the placeholders a schema actually uses
+    go into the key, so schemas without them compile once for every message."""
+    schema_bytes = orjson.dumps(openapi_schema)
+    chat_session_id = (
+        dynamic_schema_info.chat_session_id
+        if dynamic_schema_info and _CHAT_SESSION_ID_PLACEHOLDER_BYTES in schema_bytes
+        else None
+    )
+    message_id = (
+        dynamic_schema_info.message_id
+        if dynamic_schema_info and _MESSAGE_ID_PLACEHOLDER_BYTES in schema_bytes
+        else None
+    )
+    schema_digest = hashlib.blake2b(schema_bytes, digest_size=16).digest()
+    cache_key = (schema_digest, chat_session_id, message_id)
+
+    with _compiled_schema_cache_lock:
+        cached = _compiled_schema_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     if dynamic_schema_info:
         # Process dynamic schema information
-        schema_str = json.dumps(openapi_schema)
         placeholders = {
-            CHAT_SESSION_ID_PLACEHOLDER: dynamic_schema_info.chat_session_id,
-            MESSAGE_ID_PLACEHOLDER: dynamic_schema_info.message_id,
+            CHAT_SESSION_ID_PLACEHOLDER: chat_session_id,
+            MESSAGE_ID_PLACEHOLDER: message_id,
+        }
+        mapping = {
+            placeholder: str(value)
+            for placeholder, value in placeholders.items()
+            if value
         }
+        if mapping:
+            openapi_schema = _substitute_placeholders(openapi_schema, mapping)
 
-        for placeholder, value in placeholders.items():
-            if value:
-                schema_str = schema_str.replace(placeholder, str(value))
+    compiled = (openapi_to_url(openapi_schema), openapi_to_method_specs(openapi_schema))
 
-        openapi_schema = json.loads(schema_str)
+    with _compiled_schema_cache_lock:
+        if len(_compiled_schema_cache) >= _COMPILED_SCHEMA_CACHE_SIZE:
+            # FIFO eviction, dicts keep insertion order
+            _compiled_schema_cache.pop(next(iter(_compiled_schema_cache)))
+        _compiled_schema_cache[cache_key] = compiled
+    return compiled
 
-    url = openapi_to_url(openapi_schema)
-    method_specs = openapi_to_method_specs(openapi_schema)
+
+def build_custom_tools_from_openapi_schema_and_headers(
+    openapi_schema: dict[str, Any],
+    custom_headers: list[HeaderItemDict] | None = None,
+    dynamic_schema_info: DynamicSchemaInfo | None = None,
+    user_oauth_token: str | None = None,
+    answer_style_config: AnswerStyleConfig | None = None,
+    prompt_config: PromptConfig | None = None,
+) -> list[CustomTool]:
+    url, method_specs = _compile_openapi_schema(openapi_schema, dynamic_schema_info)
     return [
         CustomTool(
             method_spec,
@@ -774,24 +999,35 @@ if __name__ == "__main__":
             print(tool_response)
 
 import csv
+import hashlib
 import json
+import re
+import threading
 import uuid
 from collections.abc import Generator
+from collections.abc import Iterator
 from io import BytesIO
 from io import StringIO
+from itertools import islice
 from typing import Any
 from typing import cast
 from typing import Dict
+from typing import IO
 from typing import List
 
+import orjson
 import requests
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
 from pydantic import BaseModel
-from requests import JSONDecodeError
+from sqlalchemy.orm import Session
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 
 from onyx.chat.prompt_builder.answer_prompt_builder import AnswerPromptBuilder
 from onyx.configs.constants import FileOrigin
+from onyx.db.engine.sql_engine import get_session_with_current_tenant
 from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.models import ChatFileType
 from onyx.file_store.models import InMemoryChatFile
@@ -837,6 +1073,53 @@ logger = setup_logger()
 
 CUSTOM_TOOL_RESPONSE_ID = "custom_tool_response"
 
+# LLM output wrapped in a markdown code fence, optionally tagged as json
+_CODE_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+_HTTP_POOL_CONNECTIONS = 32
+_HTTP_POOL_MAXSIZE = 64
+
+
+def _build_http_session() -> requests.Session:
+    # urllib3 only retries idempotent methods by default, so POSTs are never replayed.
+    # raise_on_status=False hands the last 5xx back to the tool like before.
+    retry = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=_HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# shared across tools so keep-alive connections (and TLS sessions) are reused between
+# calls; auth and headers stay per-request since they differ between tools
+_HTTP_SESSION = _build_http_session()
+
+# orjson silently turns integers that don't fit in 64 bits (19+ digits) into floats
+_LONG_INT_RE = re.compile(rb"\d{19}")
+
+
+def _load_json_response(response: requests.Response) -> Any:
+    """Decodes a JSON body with orjson. Bodies orjson rejects or can't represent
+    exactly (non UTF-8 encodings, NaN/Infinity, integers beyond 64 bits) go through
+    response.json() instead. Raises json.JSONDecodeError if the body isn't JSON"""
+    content = response.content
+    if not _LONG_INT_RE.search(content):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return response.json()
+
 
 class CustomToolUserFileSnapshot(BaseModel):
     file_ids: List[str]  # References to saved images or CSVs
@@ -861,19 +1144,26 @@ class CustomTool(BaseTool):
         self._base_url = base_url
         self._method_spec = method_spec
         self._tool_definition = self._method_spec.to_tool_definition()
+        self._tool_parameters = self._tool_definition["function"]["parameters"]
+        # the spec never changes for a tool, so resolve its parameter names once
+        self._path_param_names = tuple(
+            schema["name"] for schema in method_spec.get_path_param_schemas()
+        )
+        self._query_param_names = tuple(
+            schema["name"] for schema in method_spec.get_query_param_schemas()
+        )
         self._user_oauth_token = user_oauth_token
         self._id = id
 
         self._name = self._method_spec.name
         self._description = self._method_spec.summary
-        self.headers = (
-            header_list_to_header_dict(custom_headers) if custom_headers else {}
+        # case-insensitive so the OAuth token replaces an "AUTHORIZATION" header too
+        self.headers: CaseInsensitiveDict[str] = CaseInsensitiveDict(
+            header_list_to_header_dict(custom_headers) if custom_headers else None
         )
 
         # Check for both Authorization header and OAuth token
-        has_auth_header = any(
-            key.lower() == "authorization" for key in self.headers.keys()
-        )
+        has_auth_header = "Authorization" in self.headers
         if has_auth_header and self._user_oauth_token:
             logger.warning(
                 f"Tool '{self._name}' has both an Authorization "
@@ -912,10 +1202,12 @@ class CustomTool(BaseTool):
 
         if response.response_type == "image" or response.response_type == "csv":
             image_response = cast(CustomToolUserFileSnapshot, response.tool_result)
-            return json.dumps({"file_ids": image_response.file_ids})
+            return orjson.dumps({"file_ids": image_response.file_ids}).decode()
 
         # For JSON or other responses, return as-is
-        return json.dumps(response.tool_result)
+        return orjson.dumps(
+            response.tool_result, option=orjson.OPT_NON_STR_KEYS
+        ).decode()
 
     """For LLMs which do NOT support explicit tool calling"""
 
@@ -943,6 +1235,10 @@ class CustomTool(BaseTool):
             if cast(str, should_use_result.content).strip() != USE_TOOL:
                 return None
 
+        # nothing for the LLM to fill in, skip the argument call entirely
+        if not self._tool_parameters.get("properties"):
+            return {}
+
         args_result = llm.invoke(
             [
                 SystemMessage(content=TOOL_ARG_SYSTEM_PROMPT),
@@ -952,48 +1248,42 @@ class CustomTool(BaseTool):
                         query=query,
                         tool_name=self.name,
                         tool_description=self.description,
-                        tool_args=self.tool_definition()["function"]["parameters"],
+                        tool_args=self._tool_parameters,
                     )
                 ),
             ]
         )
         args_result_str = cast(str, args_result.content)
 
+        fence_match = _CODE_FENCE_RE.match(args_result_str)
+        payload = fence_match.group(1) if fence_match else args_result_str.strip()
         try:
-            return json.loads(args_result_str.strip())
-        except json.JSONDecodeError:
-            pass
-
-        # try removing ```
-        try:
-            return json.loads(args_result_str.strip("```"))
+            return json.loads(payload)
         except json.JSONDecodeError:
-            pass
-
-        # try removing ```json
-        try:
-            return json.loads(args_result_str.strip("```").strip("json"))
-        except json.JSONDecodeError:
-            pass
-
-        # pretend like nothing happened if not parse-able
-        logger.error(
-            f"Failed to parse args for '{self.name}' tool. Recieved: {args_result_str}"
-        )
-        return None
+            # pretend like nothing happened if not parse-able
+            logger.error(
+                f"Failed to parse args for '{self.name}' tool. Recieved: {args_result_str}"
+            )
+            return None
 
     def _save_and_get_file_references(
-        self, file_content: bytes | str, content_type: str
+        self,
+        file_content: bytes | str | IO[bytes],
+        content_type: str,
+        db_session: Session | None = None,
     ) -> List[str]:
         file_store = get_default_file_store()
 
         file_id = str(uuid.uuid4())
 
-        # Handle both binary and text content
+        # Handle text, binary and file-like (e.g. a streamed response body) content
+        content: IO[bytes]
         if isinstance(file_content, str):
             content = BytesIO(file_content.encode())
-        else:
+        elif isinstance(file_content, bytes):
             content = BytesIO(file_content)
+        else:
+            content = file_content
 
         file_store.save_file(
             file_id=file_id,
@@ -1004,14 +1294,30 @@ class CustomTool(BaseTool):
             file_metadata={
                 "content_type": content_type,
             },
+            db_session=db_session,
         )
 
         return [file_id]
 
-    def _parse_csv(self, csv_text: str) -> List[Dict[str, Any]]:
-        csv_file = StringIO(csv_text)
-        reader = csv.DictReader(csv_file)
-        return [row for row in reader]
+    def _save_response_body(
+        self,
+        response: requests.Response,
+        content_type: str,
+        db_session: Session | None = None,
+    ) -> List[str]:
+        # hand the socket stream (gzip-decoded on the fly) to the file store rather
+        # than buffering it into response.content and copying it into a BytesIO
+        try:
+            response.raw.decode_content = True
+            return self._save_and_get_file_references(
+                response.raw, content_type, db_session
+            )
+        finally:
+            response.close()
+
+    def _parse_csv(self, csv_text: str) -> Iterator[Dict[str, Any]]:
+        # rows are yielded lazily so large exports are never held as a list of dicts
+        return csv.DictReader(StringIO(csv_text))
 
     """Actual execution of the tool"""
 
@@ -1020,47 +1326,36 @@ class CustomTool(BaseTool):
     ) -> Generator[ToolResponse, None, None]:
         request_body = kwargs.get(REQUEST_BODY)
 
-        path_params = {}
-
-        for path_param_schema in self._method_spec.get_path_param_schemas():
-            path_params[path_param_schema["name"]] = kwargs[path_param_schema["name"]]
-
-        query_params = {}
-        for query_param_schema in self._method_spec.get_query_param_schemas():
-            if query_param_schema["name"] in kwargs:
-                query_params[query_param_schema["name"]] = kwargs[
-                    query_param_schema["name"]
-                ]
+        path_params = {name: kwargs[name] for name in self._path_param_names}
+        query_params = {
+            name: kwargs[name] for name in self._query_param_names if name in kwargs
+        }
 
         url = self._method_spec.build_url(self._base_url, path_params, query_params)
         method = self._method_spec.method
 
-        response = requests.request(
-            method, url, json=request_body, headers=self.headers
+        response = _HTTP_SESSION.request(
+            method, url, json=request_body, headers=self.headers, stream=True
         )
         content_type = response.headers.get("Content-Type", "")
 
         tool_result: Any
         response_type: str
         if "text/csv" in content_type:
-            file_ids = self._save_and_get_file_references(
-                response.content, content_type
-            )
+            file_ids = self._save_response_body(response, content_type)
             tool_result = CustomToolUserFileSnapshot(file_ids=file_ids)
             response_type = "csv"
 
         elif "image/" in content_type:
-            file_ids = self._save_and_get_file_references(
-                response.content, content_type
-            )
+            file_ids = self._save_response_body(response, content_type)
             tool_result = CustomToolUserFileSnapshot(file_ids=file_ids)
             response_type = "image"
 
         else:
             try:
-                tool_result = response.json()
+                tool_result = _load_json_response(response)
                 response_type = "json"
-            except JSONDecodeError:
+            except json.JSONDecodeError:
                 logger.exception(
                     f"Failed to parse response as JSON for tool '{self._name}'"
                 )
@@ -1068,7 +1363,7 @@ class CustomTool(BaseTool):
                 response_type = "text"
 
         logger.info(
-            f"Returning tool response for {self._name} with type {response_type}"
+            "Returning tool response for %s with type %s", self._name, response_type
         )
 
         yield ToolResponse(
@@ -1109,28 +1404,32 @@ class CustomTool(BaseTool):
         files = []
         file_store = get_default_file_store()
 
-        for file_id in response.tool_result.file_ids:
-            try:
-                file_io = file_store.read_file(file_id, mode="b")
-                files.append(
-                    InMemoryChatFile(
-                        file_id=file_id,
-                        filename=file_id,
-                        content=file_io.read(),
-                        file_type=file_type,
+        # one session for all file records instead of one per read_file call
+        with get_session_with_current_tenant() as db_session:
+            for file_id in response.tool_result.file_ids:
+                try:
+                    file_io = file_store.read_file(
+                        file_id, mode="b", db_session=db_session
                     )
-                )
-            except Exception:
-                logger.exception(f"Failed to read file {file_id}")
+                    files.append(
+                        InMemoryChatFile(
+                            file_id=file_id,
+                            filename=file_id,
+                            content=file_io.read(),
+                            file_type=file_type,
+                        )
+                    )
+                except Exception:
+                    logger.exception(f"Failed to read file {file_id}")
 
-            # Update prompt with file content
-            prompt_builder.update_user_prompt(
-                build_custom_image_generation_user_prompt(
-                    query=prompt_builder.get_user_message_content(),
-                    files=files,
-                    file_type=file_type,
+                # Update prompt with file content
+                prompt_builder.update_user_prompt(
+                    build_custom_image_generation_user_prompt(
+                        query=prompt_builder.get_user_message_content(),
+                        files=files,
+                        file_type=file_type,
+                    )
                 )
-            )
 
         return prompt_builder
 
@@ -1141,29 +1440,121 @@ class CustomTool(BaseTool):
         return response.tool_result
 
 
-def build_custom_tools_from_openapi_schema_and_headers(
-    tool_id: int,
+_COMPILED_SCHEMA_CACHE_SIZE = 256
+_compiled_schema_cache: dict[
+    tuple[bytes, Any, Any], tuple[str, tuple[MethodSpec, ...]]
+] = {}
+_compiled_schema_cache_lock = threading.Lock()
+# to tell from the serialized schema whether it depends on the chat session / message
+_CHAT_SESSION_ID_PLACEHOLDER_BYTES = CHAT_SESSION_ID_PLACEHOLDER.encode()
+_MESSAGE_ID_PLACEHOLDER_BYTES = MESSAGE_ID_PLACEHOLDER.encode()
+
+
+# all placeholders in one alternation so each string is scanned once
+_PLACEHOLDER_RE = re.compile(
+    "|".join(
+        re.escape(placeholder)
+        for placeholder in (CHAT_SESSION_ID_PLACEHOLDER, MESSAGE_ID_PLACEHOLDER)
+    )
+)
+
+
+def _substitute_placeholders(obj: Any, mapping: dict[str, str]) -> Any:
+    """Replaces placeholders in every string (keys included, since paths are keys)
+    of a JSON-like object. Containers are only copied when something inside them
+    changed, untouched subtrees are shared with the input."""
+    if isinstance(obj, str):
+        if not _PLACEHOLDER_RE.search(obj):
+            return obj
+        substituted = _PLACEHOLDER_RE.sub(
+            lambda match: mapping.get(match.group(0), match.group(0)), obj
+        )
+        return obj if substituted == obj else substituted
+
+    # copies are only started at the first changed entry, so the common case of a
+    # schema without placeholders walks it without allocating anything
+    if isinstance(obj, dict):
+        new_dict: dict[Any, Any] | None = None
+        for index, (key, value) in enumerate(obj.items()):
+            new_key = _substitute_placeholders(key, mapping)
+            new_value = _substitute_placeholders(value, mapping)
+            if new_dict is None and (new_key is not key or new_value is not value):
+                new_dict = dict(islice(obj.items(), index))
+            if new_dict is not None:
+                new_dict[new_key] = new_value
+        return obj if new_dict is None else new_dict
+
+    if isinstance(obj, list):
+        new_list: list[Any] | None = None
+        for index, item in enumerate(obj):
+            new_item = _substitute_placeholders(item, mapping)
+            if new_list is None and new_item is not item:
+                new_list = obj[:index]
+            if new_list is not None:
+                new_list.append(new_item)
+        return obj if new_list is None else new_list
+
+    return obj
+
+
+def _compile_openapi_schema(
     openapi_schema: dict[str, Any],
-    custom_headers: list[HeaderItemDict] | None = None,
-    dynamic_schema_info: DynamicSchemaInfo | None = None,
-    user_oauth_token: str | None = None,
-) -> list[CustomTool]:
+    dynamic_schema_info: DynamicSchemaInfo | None,
+) -> tuple[str, tuple[MethodSpec, ...]]:
+    """Resolves placeholders and parses the schema into its base url and method specs.
+    Results are cached by schema content. Only the placeholders a schema actually uses
+    go into the key, so schemas without them compile once for every message."""
+    schema_bytes = orjson.dumps(openapi_schema)
+    chat_session_id = (
+        dynamic_schema_info.chat_session_id
+        if dynamic_schema_info and _CHAT_SESSION_ID_PLACEHOLDER_BYTES in schema_bytes
+        else None
+    )
+    message_id = (
+        dynamic_schema_info.message_id
+        if dynamic_schema_info and _MESSAGE_ID_PLACEHOLDER_BYTES in schema_bytes
+        else None
+    )
+    schema_digest = hashlib.blake2b(schema_bytes, digest_size=16).digest()
+    cache_key = (schema_digest, chat_session_id, message_id)
+
+    with _compiled_schema_cache_lock:
+        cached = _compiled_schema_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     if dynamic_schema_info:
         # Process dynamic schema information
-        schema_str = json.dumps(openapi_schema)
         placeholders = {
-            CHAT_SESSION_ID_PLACEHOLDER: dynamic_schema_info.chat_session_id,
-            MESSAGE_ID_PLACEHOLDER: dynamic_schema_info.message_id,
+            CHAT_SESSION_ID_PLACEHOLDER: chat_session_id,
+            MESSAGE_ID_PLACEHOLDER: message_id,
         }
+        mapping = {
+            placeholder: str(value)
+            for placeholder, value in placeholders.items()
+            if value
+        }
+        if mapping:
+            openapi_schema = _substitute_placeholders(openapi_schema, mapping)
+
+    compiled = (openapi_to_url(openapi_schema), openapi_to_method_specs(openapi_schema))
 
-        for placeholder, value in placeholders.items():
-            if value:
-                schema_str = schema_str.replace(placeholder, str(value))
+    with _compiled_schema_cache_lock:
+        if len(_compiled_schema_cache) >= _COMPILED_SCHEMA_CACHE_SIZE:
+            # FIFO eviction, dicts keep insertion order
+            _compiled_schema_cache.pop(next(iter(_compiled_schema_cache)))
+        _compiled_schema_cache[cache_key] = compiled
+    return compiled
 
-        openapi_schema = json.loads(schema_str)
 
-    url = openapi_to_url(openapi_schema)
-    method_specs = openapi_to_method_specs(openapi_schema)
+def build_custom_tools_from_openapi_schema_and_headers(
+    tool_id: int,
+    openapi_schema: dict[str, Any],
+    custom_headers: list[HeaderItemDict] | None = None,
+    dynamic_schema_info: DynamicSchemaInfo | None = None,
+    user_oauth_token: str | None = None,
+) -> list[CustomTool]:
+    url, method_specs = _compile_openapi_schema(openapi_schema, dynamic_schema_info)
 
     return [
         CustomTool(
@@ -2,6 +2,7 @@ from typing import Any
 from typing import cast
 
 from pydantic import BaseModel
+from pydantic import PrivateAttr
 
 REQUEST_BODY = "requestBody"
 
@@ -18,6 +19,8 @@ class MethodSpec(BaseModel):
     method: str
     spec: dict[str, Any]
 
+    _tool_definition: dict[str, Any] | None = PrivateAttr(default=None)
+
     def get_request_body_schema(self) -> dict[str, Any]:
         content = self.spec.get("requestBody", {}).get("content", {})
         if "application/json" in content:
@@ -61,6 +64,13 @@ class MethodSpec(BaseModel):
         return url
 
     def to_tool_definition(self) -> dict[str, Any]:
+        # specs are reused across tool builds (see _compile_openapi_schema), so the
+        # definition is only derived once per spec. Treat the result as read-only.
+        if self._tool_definition is None:
+            self._tool_definition = self._build_tool_definition()
+        return self._tool_definition
+
+    def _build_tool_definition(self) -> dict[str, Any]:
         tool_definition: Any = {
             "type": "function",
             "function": {
@@ -122,10 +132,12 @@ def openapi_to_path_specs(openapi_spec: dict[str, Any]) -> list[PathSpec]:
 """Method-level utils"""
 
 
-def openapi_to_method_specs(openapi_spec: dict[str, Any]) -> list[MethodSpec]:
+def openapi_to_method_specs(
+    openapi_spec: dict[str, Any]
+) -> tuple[MethodSpec, ...]:
     path_specs = openapi_to_path_specs(openapi_spec)
 
-    method_specs = []
+    method_specs: list[MethodSpec] = []
     for path_spec in path_specs:
         for method_name, method in path_spec.methods.items():
             name = method.get("operationId")
@@ -153,7 +165,7 @@ def openapi_to_method_specs(openapi_spec: dict[str, Any]) -> list[MethodSpec]:
     if not method_specs:
         raise ValueError("No methods found in OpenAPI schema")
 
-    return method_specs
+    return tuple(method_specs)
 
 
 def openapi_to_url(openapi_schema: dict[str, dict | str]) -> str:
@@ -1,8 +1,11 @@
-import json
+import logging
+import re
 from collections.abc import Generator
+from functools import cached_property
 from typing import Any
 from typing import cast
 
+import orjson
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -56,7 +59,8 @@ from onyx.tools.tool_implementations.search_like_tool_utils import (
 )
 from onyx.utils.logger import setup_logger
 from onyx.utils.special_types import JSON_ro
-from langchain.schema import SystemMessage, HumanMessage
+from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import wait_on_background
 
 logger = setup_logger()
 
@@ -104,6 +108,86 @@ DEFAULT_SEARCH_FALLBACK_DATA_SOURCE_SELECTOR_PROMPT = """Give empty string or em
 DEFAULT_SEARCH_STATUS_PROMPT = """
 """
 
+
+# Messages that are only a greeting or acknowledgement. Anything else, including a
+# greeting followed by a question, still goes through the LLM search check
+_SKIP_SEARCH_RE = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|bye|goodbye)\s*[!.?]*\s*$",
+    re.IGNORECASE,
+)
+
+# Used to pick the knowledge bases to search for LLMs without native tool calling
+KB_SELECTION_SYSTEM_PROMPT = """You are a helpful assistant that analyzes queries to determine the most appropriate knowledge bases for searching.
+
+Key Principles:
+1. Consider the query type and intent:
+   - What kind of information is being sought?
+   - What context would be most relevant?
+   - What sources typically contain this type of information?
+
+2. Search Strategy:
+   - Include knowledge bases that might contain primary information
+   - Include knowledge bases that might contain supporting context
+   - Consider both explicit and implicit information sources
+
+3. Return Format:
+   - Return an array of ALL relevant knowledge base names
+   - Include any knowledge base that might contain relevant information
+   - Do not limit yourself to just the most obvious sources
+
+Remember: It's better to include a potentially relevant knowledge base than to miss important information."""
+
+KB_SELECTION_USER_PROMPT = """Please analyze this query and determine the most appropriate knowledge bases to search:
+
+Query: {query}
+
+Previous Context: {previous_context}
+
+Consider:
+1. What type of information is being sought?
+2. What knowledge bases might contain this information?
+3. What supporting context might be relevant?
+4. If this is a follow-up query, maintain focus on the original subject
+
+{data_source_selector_prompt}
+
+Additionally, consider which knowledge bases might be useful as fallback options if the primary search doesn't yield sufficient results:
+
+{fallback_data_source_selector_prompt}"""
+
+
+def _as_list(value: str | list[str] | None) -> list[str]:
+    """The LLM sometimes returns a single knowledge base as a bare string. Lists are
+    deduplicated and sorted so the same set of knowledge bases always yields the same
+    filters (and search cache key) regardless of the order the LLM listed them in"""
+    if value is None:
+        return []
+    if type(value) is str:
+        return [value]
+    return sorted(set(value))
+
+
+def _empty_search_responses(
+    query: str, search_pipeline: SearchPipeline
+) -> Generator[ToolResponse, None, None]:
+    """The responses for a search whose results were all judged irrelevant. Fresh
+    containers are built each time since consumers may extend the doc lists"""
+    yield ToolResponse(
+        id=SEARCH_RESPONSE_SUMMARY_ID,
+        response=SearchResponseSummary(
+            rephrased_query=query,
+            top_sections=[],
+            predicted_flow=search_pipeline.predicted_flow,
+            predicted_search=search_pipeline.predicted_search_type,
+            final_filters=search_pipeline.search_query.filters,
+            recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
+        ),
+    )
+    yield ToolResponse(id=SEARCH_DOC_CONTENT_ID, response=OnyxContexts(contexts=[]))
+    yield ToolResponse(id=SECTION_RELEVANCE_LIST_ID, response=[])
+    yield ToolResponse(id=FINAL_CONTEXT_DOCUMENTS_ID, response=[])
+
+
 class SearchTool(Tool):
     _NAME = "run_search"
     _DISPLAY_NAME = "Search Tool"
@@ -133,6 +217,9 @@ class SearchTool(Tool):
     ) -> None:
         self.user = user
         self.persona = persona
+        # the search prompts all come from the persona's first prompt; resolving the
+        # relationship once avoids walking (or lazy loading) it for every property
+        self._prompt: Prompt | None = persona.prompts[0] if persona.prompts else None
         self.retrieval_options = retrieval_options
         self.prompt_config = prompt_config
         self.llm = llm
@@ -178,6 +265,7 @@ class SearchTool(Tool):
         num_chunk_multiple = self.chunks_above + self.chunks_below + 1
 
         self.answer_style_config = answer_style_config
+        self._tool_definition: dict | None = None
         self.contextual_pruning_config = (
             ContextualPruningConfig.from_doc_pruning_config(
                 num_chunk_multiple=num_chunk_multiple, doc_pruning_config=pruning_config
@@ -188,28 +276,44 @@ class SearchTool(Tool):
     def name(self) -> str:
         return self._NAME
 
-    @property
+    @cached_property
     def description(self) -> str:
-        search_tool_description_prompt = self.persona.prompts[0].search_tool_description if self.persona.prompts[0].search_tool_description else DEFAULT_SEARCH_TOOL_DESCRIPTION_PROMPT
+        search_tool_description_prompt = (
+            self._prompt.search_tool_description
+            if self._prompt and self._prompt.search_tool_description
+            else DEFAULT_SEARCH_TOOL_DESCRIPTION_PROMPT
+        )
         return search_tool_description_prompt
 
-    @property
+    @cached_property
     def searchQueryPrompt(self) -> str:
-        search_query_prompt = self.persona.prompts[0].search_query_prompt if self.persona.prompts[0].search_query_prompt else DEFAULT_SEARCH_QUERY_PROMPT
+        search_query_prompt = (
+            self._prompt.search_query_prompt
+            if self._prompt and self._prompt.search_query_prompt
+            else DEFAULT_SEARCH_QUERY_PROMPT
+        )
         return search_query_prompt
     
-    @property
+    @cached_property
     def searchDataSourceSelectorPrompt(self) -> str:
-        search_data_source_selector_prompt = self.persona.prompts[0].search_data_source_selector_prompt if self.persona.prompts[0].search_data_source_selector_prompt else DEFAULT_SEARCH_DATA_SOURCE_SELECTOR_PROMPT
+        search_data_source_selector_prompt = (
+            self._prompt.search_data_source_selector_prompt
+            if self._prompt and self._prompt.search_data_source_selector_prompt
+            else DEFAULT_SEARCH_DATA_SOURCE_SELECTOR_PROMPT
+        )
         return search_data_source_selector_prompt
 
-    @property
+    @cached_property
     def searchFallbackDataSourceSelectorPrompt(self) -> str:
         #search_fallback_data_source_selector_prompt = self.persona.prompts[0].search_fallback_data_source_selector_prompt if self.persona.prompts[0].search_fallback_data_source_selector_prompt else DEFAULT_SEARCH_FALLBACK_DATA_SOURCE_SELECTOR_PROMPT
-        search_fallback_data_source_selector_prompt = self.persona.prompts[0].search_data_source_selector_prompt if self.persona.prompts[0].search_data_source_selector_prompt else DEFAULT_SEARCH_FALLBACK_DATA_SOURCE_SELECTOR_PROMPT
+        search_fallback_data_source_selector_prompt = (
+            self._prompt.search_data_source_selector_prompt
+            if self._prompt and self._prompt.search_data_source_selector_prompt
+            else DEFAULT_SEARCH_FALLBACK_DATA_SOURCE_SELECTOR_PROMPT
+        )
         return search_fallback_data_source_selector_prompt
 
-    @property
+    @cached_property
     def searchStatusPrompt(self) -> str:
         search_status_prompt = self.searchQueryPrompt
         return search_status_prompt
@@ -221,6 +325,13 @@ class SearchTool(Tool):
     """For explicit tool calling"""
 
     def tool_definition(self) -> dict:
+        # the persona's prompts don't change over the life of the tool, so the
+        # definition is only built once
+        if self._tool_definition is None:
+            self._tool_definition = self._build_tool_definition()
+        return self._tool_definition
+
+    def _build_tool_definition(self) -> dict:
         return {
             "type": "function",
             "function": {
@@ -278,29 +389,35 @@ class SearchTool(Tool):
 
         # Include uploaded files if they exist
         if self._uploaded_files:
-            uploaded_files_data = []
-            for file in self._uploaded_files:
-                file_data = {
-                    "filename": file.filename,
-                    "file_type": file.file_type.value,
-                }
-                
-                # Include file content for text files
-                if file.file_type in [ChatFileType.PLAIN_TEXT, ChatFileType.CSV, ChatFileType.DOC]:
-                    try:
-                        content = file.content.decode('utf-8') if isinstance(file.content, bytes) else file.content
-                        file_data["content"] = content
-                    except UnicodeDecodeError:
-                        file_data["content"] = f"[Binary file: {file.filename}]"
-                else:
-                    # For other file types, include a reference
-                    file_data["content"] = f"[File: {file.filename}]"
-                
-                uploaded_files_data.append(file_data)
-            
-            result["uploaded_files"] = uploaded_files_data
+            result["uploaded_files"] = self._uploaded_files_data
+
+        return orjson.dumps(result).decode()
+
+    @cached_property
+    def _uploaded_files_data(self) -> list[dict[str, str]]:
+        # The uploads are fixed for the life of the tool, so they are only decoded
+        # once no matter how many tool messages get built
+        uploaded_files_data = []
+        for file in self._uploaded_files:
+            file_data = {
+                "filename": file.filename,
+                "file_type": file.file_type.value,
+            }
+
+            # Include file content for text files. Undecodable bytes are replaced
+            # rather than dropping the whole file
+            if file.file_type in [ChatFileType.PLAIN_TEXT, ChatFileType.CSV, ChatFileType.DOC]:
+                file_data["content"] = (
+                    file.content
+                    if isinstance(file.content, str)
+                    else file.content.decode("utf-8", errors="replace")
+                )
+            else:
+                # For other file types, include a reference
+                file_data["content"] = f"[File: {file.filename}]"
 
-        return json.dumps(result)
+            uploaded_files_data.append(file_data)
+        return uploaded_files_data
 
     """For LLMs that don't support tool calling"""
 
@@ -312,7 +429,10 @@ class SearchTool(Tool):
         prompt_config: PromptConfig,
         force_run: bool = False,
     ) -> dict[str, Any] | None:
-        logger.info(f"get_args_for_non_tool_calling_llm in {query}")
+        logger.info("get_args_for_non_tool_calling_llm in %s", query)
+        if not force_run and _SKIP_SEARCH_RE.match(query):
+            # greetings / acknowledgements never need a search, skip the LLM check
+            return None
         if not force_run and not check_if_need_search(
             query=query, history=history, llm=llm
         ):
@@ -320,61 +440,35 @@ class SearchTool(Tool):
         
         # Use the uploaded files that were passed to the constructor
         uploaded_files = self._uploaded_files
-        if uploaded_files:
-            logger.info(f"[FILE TRACKING] Using {len(uploaded_files)} uploaded files for query rephrase")
+        if uploaded_files and logger.isEnabledFor(logging.INFO):
+            logger.info("[FILE TRACKING] Using %d uploaded files for query rephrase", len(uploaded_files))
             for file in uploaded_files:
-                logger.info(f"[FILE TRACKING] File: {file.filename}, Type: {file.file_type.value}")
+                logger.info("[FILE TRACKING] File: %s, Type: %s", file.filename, file.file_type.value)
         
-        # First rephrase the query with file context
-        rephrased_query = history_based_query_rephrase(
-            query=query, history=history, llm=llm, note=prompt_config.history_query_rephrase,
-            uploaded_files=uploaded_files
+        # Rephrase the query with file context. The knowledge base selection below
+        # doesn't depend on the rephrased query, so both LLM calls run concurrently
+        rephrase_task = run_in_background(
+            history_based_query_rephrase,
+            query=query,
+            history=history,
+            llm=llm,
+            note=prompt_config.history_query_rephrase,
+            uploaded_files=uploaded_files,
         )
         
-        # Create a system message to guide the LLM
-        system_message = SystemMessage(content="""You are a helpful assistant that analyzes queries to determine the most appropriate knowledge bases for searching.
-
-Key Principles:
-1. Consider the query type and intent:
-   - What kind of information is being sought?
-   - What context would be most relevant?
-   - What sources typically contain this type of information?
-
-2. Search Strategy:
-   - Include knowledge bases that might contain primary information
-   - Include knowledge bases that might contain supporting context
-   - Consider both explicit and implicit information sources
-
-3. Return Format:
-   - Return an array of ALL relevant knowledge base names
-   - Include any knowledge base that might contain relevant information
-   - Do not limit yourself to just the most obvious sources
-
-Remember: It's better to include a potentially relevant knowledge base than to miss important information.""")
-
         # Create the user message with the query
-        user_message = HumanMessage(content=f"""Please analyze this query and determine the most appropriate knowledge bases to search:
-
-Query: {query}
-
-Previous Context: {history[-1].message if history else 'No previous context'}
-
-Consider:
-1. What type of information is being sought?
-2. What knowledge bases might contain this information?
-3. What supporting context might be relevant?
-4. If this is a follow-up query, maintain focus on the original subject
-
-{self.searchDataSourceSelectorPrompt}
-
-Additionally, consider which knowledge bases might be useful as fallback options if the primary search doesn't yield sufficient results:
-
-{self.searchFallbackDataSourceSelectorPrompt}""")
+        user_prompt = KB_SELECTION_USER_PROMPT.format(
+            query=query,
+            previous_context=history[-1].message if history else "No previous context",
+            data_source_selector_prompt=self.searchDataSourceSelectorPrompt,
+            fallback_data_source_selector_prompt=self.searchFallbackDataSourceSelectorPrompt,
+        )
 
+        args: dict[str, Any] = {}
         try:
             # Call the LLM with tool calling enabled
             response = llm.invoke(
-                prompt=f"{system_message.content}\n\n{user_message.content}",
+                prompt=f"{KB_SELECTION_SYSTEM_PROMPT}\n\n{user_prompt}",
                 tools=[self.tool_definition()],
                 tool_choice="required"
             )
@@ -383,33 +477,19 @@ Additionally, consider which knowledge bases might be useful as fallback options
             if hasattr(response, 'tool_calls') and response.tool_calls:
                 tool_call = response.tool_calls[0]
                 args = tool_call.get('args', {})
-                
-                return {
-                    "query": rephrased_query,
-                    "solution_kb": args.get("solution_kb", []),
-                    "fallback_kb": args.get("fallback_kb", []),
-                    "status": args.get("status", ""),
-                    "ticket_id": args.get("ticket_id", "")
-                }
             else:
                 logger.error("No tool call found in LLM response")
-                return {
-                    "query": rephrased_query,
-                    "solution_kb": [],
-                    "fallback_kb": [],
-                    "status": "",
-                    "ticket_id": ""
-                }
                 
         except Exception as e:
-            logger.error(f"Error in tool call analysis: {e}")
-            return {
-                "query": rephrased_query,
-                "solution_kb": [],
-                "fallback_kb": [],
-                "status": "",
-                "ticket_id": ""
-            }
+            logger.error("Error in tool call analysis: %s", e)
+
+        return {
+            "query": wait_on_background(rephrase_task),
+            "solution_kb": args.get("solution_kb", []),
+            "fallback_kb": args.get("fallback_kb", []),
+            "status": args.get("status", ""),
+            "ticket_id": args.get("ticket_id", "")
+        }
 
     """Actual tool execution"""
 
@@ -431,9 +511,10 @@ Additionally, consider which knowledge bases might be useful as fallback options
             ),
         )
 
-        # Build selected sections for specified documents
+        # Build selected sections for specified documents. The ids come from already
+        # validated chunks, so the pieces are built without re-validating them
         selected_sections = [
-            SectionRelevancePiece(
+            SectionRelevancePiece.model_construct(
                 relevant=True,
                 document_id=section.center_chunk.document_id,
                 chunk_id=section.center_chunk.chunk_id,
@@ -465,258 +546,182 @@ Additionally, consider which knowledge bases might be useful as fallback options
     def run(self, **kwargs: str) -> Generator[ToolResponse, None, None]:
         query = cast(str, kwargs["query"])
         # Ensure solution_kb and fallback_kb are always lists
-        solution_kb = kwargs.get("solution_kb", [])
-        fallback_kb = kwargs.get("fallback_kb", [])
-        if isinstance(solution_kb, str):
-            solution_kb = [solution_kb]
-        if isinstance(fallback_kb, str):
-            fallback_kb = [fallback_kb]
+        solution_kb = _as_list(kwargs.get("solution_kb"))
+        fallback_kb = _as_list(kwargs.get("fallback_kb"))
         status = cast(str, kwargs.get("status", ""))
         ticket_id = cast(str, kwargs.get("ticket_id", ""))
         
         if self.selected_sections:
             yield from self._build_response_for_specified_sections(query)
             return
-        
+
+        yield from self._run_search(
+            query, solution_kb, fallback_kb, status, ticket_id
+        )
+
+    def _run_search(
+        self,
+        query: str,
+        solution_kb: list[str],
+        fallback_kb: list[str],
+        status: str,
+        ticket_id: str,
+    ) -> Generator[ToolResponse, None, None]:
         # Get existing filters from retrieval_options if they exist
         existing_filters = self.retrieval_options.filters if self.retrieval_options else None
-        logger.info(f"Existing filters: {existing_filters}")
+        logger.info("Existing filters: %s", existing_filters)
         
         # Check if user has already selected any source - if so, skip solution_kb/fallback_kb logic
-        user_has_selected_source = False
-        if existing_filters:
-            user_has_selected_source = bool(
-                existing_filters.source_type or 
-                existing_filters.connector_name or 
-                existing_filters.document_set
+        user_has_selected_source = bool(
+            existing_filters
+            and (
+                existing_filters.source_type
+                or existing_filters.connector_name
+                or existing_filters.document_set
             )
+        )
         
+        # Every search below uses these filters and only swaps out the connector (and,
+        # for a pre-selected source, drops status/ticket_id), so they are validated once
+        # and copied with model_copy for each variant
+        base_filters = IndexFilters(
+            tenant_id=existing_filters.tenant_id if existing_filters else None,
+            access_control_list=existing_filters.access_control_list if existing_filters else None,
+            source_type=existing_filters.source_type if existing_filters else None,
+            tags=existing_filters.tags if existing_filters else None,
+            document_set=existing_filters.document_set if existing_filters else None,
+            time_range=existing_filters.time_range if existing_filters else None,
+            connector_name=None,
+            status=status if status else None,
+            ticket_id=ticket_id if ticket_id else None
+        )
+
         if user_has_selected_source:
             logger.info("User has already selected a source, using existing filters only not any solution_kb")
             # todo: we need to remove this indexfilters and use basefilters only
             # merged_filters = existing_filters
-            # Create IndexFilters from existing BaseFilters to ensure compatibility
-            merged_filters = IndexFilters(
-                tenant_id=existing_filters.tenant_id,
-                access_control_list=existing_filters.access_control_list,
-                source_type=existing_filters.source_type,
-                tags=existing_filters.tags,
-                document_set=existing_filters.document_set,
-                time_range=existing_filters.time_range,
-                connector_name=existing_filters.connector_name,
-                status=None,  # Not relevant when user has pre-selected source
-                ticket_id=None  # Not relevant when user has pre-selected source
+            merged_filters = base_filters.model_copy(
+                update={
+                    "connector_name": existing_filters.connector_name,
+                    # Not relevant when user has pre-selected source
+                    "status": None,
+                    "ticket_id": None,
+                }
             )
         else:
             # First try with solution_kb
-            merged_filters = IndexFilters(
-                tenant_id=existing_filters.tenant_id if existing_filters else None,
-                access_control_list=existing_filters.access_control_list if existing_filters else None,
-                source_type=existing_filters.source_type if existing_filters else None,
-                tags=existing_filters.tags if existing_filters else None,  
-                document_set=existing_filters.document_set if existing_filters else None,
-                time_range=existing_filters.time_range if existing_filters else None,
-                connector_name=solution_kb,  # Use solution_kb first
-                status=status if status else None,
-                ticket_id=ticket_id if ticket_id else None
+            merged_filters = base_filters.model_copy(
+                update={"connector_name": solution_kb}
             )
 
-        search_pipeline = SearchPipeline(
-            search_request=SearchRequest(
-                query=query,
-                evaluation_type=self.evaluation_type,
-                human_selected_filters=merged_filters,
-                persona=self.persona,
-                offset=self.retrieval_options.offset if self.retrieval_options else None,
-                limit=self.retrieval_options.limit if self.retrieval_options else None,
-                rerank_settings=self.rerank_settings,
-                chunks_above=self.chunks_above,
-                chunks_below=self.chunks_below,
-                full_doc=self.full_doc,
-                enable_auto_detect_filters=self.retrieval_options.enable_auto_detect_filters if self.retrieval_options else None,
-            ),
-            user=self.user,
-            llm=self.llm,
-            fast_llm=self.fast_llm,
-            bypass_acl=self.bypass_acl,
-            db_session=self.db_session,
-            prompt_config=self.prompt_config,
-        )
+        search_pipeline = self._make_pipeline(query, merged_filters)
+        # section_relevance_list is recomputed on every access, so it is bound once
+        # per pipeline and reset whenever search_pipeline is replaced
+        section_relevance_list: list[bool] | None = None
 
         # Only try fallback if user hasn't already selected a source
         should_try_fallback = False
         if not user_has_selected_source:
-            if not search_pipeline.final_context_sections:
+            final_context_sections = search_pipeline.final_context_sections
+            if not final_context_sections:
                 should_try_fallback = True
                 logger.info("No results found in solution_kb, trying fallback_kb")
             elif search_pipeline.section_relevance is not None:
                 # LLM relevance filtering is enabled, check if any section is relevant
-                has_relevant_sections = any(search_pipeline.section_relevance_list)
-                if not has_relevant_sections:
+                section_relevance_list = search_pipeline.section_relevance_list
+                if not any(section_relevance_list):
                     should_try_fallback = True
                     logger.info("Solution KB results not relevant, trying fallback_kb")
                 else:
-                    logger.info(f"Relevant details found in solution_kb: {len(search_pipeline.final_context_sections)} sections")
+                    logger.info("Relevant details found in solution_kb: %d sections", len(final_context_sections))
             else:
                 # LLM relevance filtering is disabled, so all sections are considered relevant
-                logger.info(f"LLM relevance filtering disabled, using all solution_kb results: {len(search_pipeline.final_context_sections)} sections")
+                logger.info("LLM relevance filtering disabled, using all solution_kb results: %d sections", len(final_context_sections))
         else:
             logger.info("User has already selected a source, using existing filters only not any fallback_kb")
-        
-        
+
+
         if should_try_fallback and fallback_kb:
             # Try with fallback_kb
-            merged_filters = IndexFilters(
-                tenant_id=existing_filters.tenant_id if existing_filters else None,
-                access_control_list=existing_filters.access_control_list if existing_filters else None,
-                source_type=existing_filters.source_type if existing_filters else None,
-                tags=existing_filters.tags if existing_filters else None,
-                document_set=existing_filters.document_set if existing_filters else None,
-                time_range=existing_filters.time_range if existing_filters else None,
-                connector_name=fallback_kb,  # Use fallback_kb
-                status=status if status else None,
-                ticket_id=ticket_id if ticket_id else None
+            merged_filters = base_filters.model_copy(
+                update={"connector_name": fallback_kb}  # Use fallback_kb
             )
 
-            search_pipeline = SearchPipeline(
-                search_request=SearchRequest(
-                    query=query,
-                    evaluation_type=self.evaluation_type,
-                    human_selected_filters=merged_filters,
-                    persona=self.persona,
-                    offset=self.retrieval_options.offset if self.retrieval_options else None,
-                    limit=self.retrieval_options.limit if self.retrieval_options else None,
-                    rerank_settings=self.rerank_settings,
-                    chunks_above=self.chunks_above,
-                    chunks_below=self.chunks_below,
-                    full_doc=self.full_doc,
-                    enable_auto_detect_filters=self.retrieval_options.enable_auto_detect_filters if self.retrieval_options else None,
-                ),
-                user=self.user,
-                llm=self.llm,
-                fast_llm=self.fast_llm,
-                bypass_acl=self.bypass_acl,
-                db_session=self.db_session,
-                prompt_config=self.prompt_config,
-            )
-            logger.info(f"Fallback KB search results count: {len(search_pipeline.final_context_sections) if search_pipeline.final_context_sections else 0}")
+            search_pipeline = self._make_pipeline(query, merged_filters)
+            section_relevance_list = None
+            final_context_sections = search_pipeline.final_context_sections
+            logger.info("Fallback KB search results count: %d", len(final_context_sections))
 
             # Check if fallback KB results are relevant
             if search_pipeline.section_relevance is not None:
-                has_relevant_sections = any(search_pipeline.section_relevance_list)
-                if not has_relevant_sections:
+                section_relevance_list = search_pipeline.section_relevance_list
+                if not any(section_relevance_list):
                     logger.info("Fallback KB results not relevant, returning empty results")
                     # Return empty results if no relevant sections found
-                    yield ToolResponse(
-                        id=SEARCH_RESPONSE_SUMMARY_ID,
-                        response=SearchResponseSummary(
-                            rephrased_query=query,
-                            top_sections=[],
-                            predicted_flow=search_pipeline.predicted_flow,
-                            predicted_search=search_pipeline.predicted_search_type,
-                            final_filters=search_pipeline.search_query.filters,
-                            recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
-                        ),
-                    )
-                    yield ToolResponse(id=SEARCH_DOC_CONTENT_ID, response=OnyxContexts(contexts=[]))
-                    yield ToolResponse(id=SECTION_RELEVANCE_LIST_ID, response=[])
-                    yield ToolResponse(id=FINAL_CONTEXT_DOCUMENTS_ID, response=[])
+                    yield from _empty_search_responses(query, search_pipeline)
                     return
                 else:
-                    logger.info(f"Relevant details found in fallback_kb: {len(search_pipeline.final_context_sections)} sections")
+                    logger.info("Relevant details found in fallback_kb: %d sections", len(final_context_sections))
             else:
                 # LLM relevance filtering is disabled, so all sections are considered relevant
-                logger.info(f"LLM relevance filtering disabled, using all fallback_kb results: {len(search_pipeline.final_context_sections)} sections")
+                logger.info("LLM relevance filtering disabled, using all fallback_kb results: %d sections", len(final_context_sections))
         elif should_try_fallback and not fallback_kb:
             # Try searching across all datasources when fallback_kb is empty
             logger.info("Fallback KB is empty, searching across all datasources")
-            merged_filters = IndexFilters(
-                tenant_id=existing_filters.tenant_id if existing_filters else None,
-                access_control_list=existing_filters.access_control_list if existing_filters else None,
-                source_type=existing_filters.source_type if existing_filters else None,
-                tags=existing_filters.tags if existing_filters else None,
-                document_set=existing_filters.document_set if existing_filters else None,
-                time_range=existing_filters.time_range if existing_filters else None,
-                connector_name=None,  # No connector filter - search all datasources
-                status=status if status else None,
-                ticket_id=ticket_id if ticket_id else None
-            )
+            # No connector filter - search all datasources
+            merged_filters = base_filters
 
-            search_pipeline = SearchPipeline(
-                search_request=SearchRequest(
-                    query=query,
-                    evaluation_type=self.evaluation_type,
-                    human_selected_filters=merged_filters,
-                    persona=self.persona,
-                    offset=self.retrieval_options.offset if self.retrieval_options else None,
-                    limit=self.retrieval_options.limit if self.retrieval_options else None,
-                    rerank_settings=self.rerank_settings,
-                    chunks_above=self.chunks_above,
-                    chunks_below=self.chunks_below,
-                    full_doc=self.full_doc,
-                    enable_auto_detect_filters=self.retrieval_options.enable_auto_detect_filters if self.retrieval_options else None,
-                ),
-                user=self.user,
-                llm=self.llm,
-                fast_llm=self.fast_llm,
-                bypass_acl=self.bypass_acl,
-                db_session=self.db_session,
-                prompt_config=self.prompt_config,
-            )
-            logger.info(f"All datasources search results count: {len(search_pipeline.final_context_sections) if search_pipeline.final_context_sections else 0}")
+            search_pipeline = self._make_pipeline(query, merged_filters)
+            section_relevance_list = None
+            final_context_sections = search_pipeline.final_context_sections
+            logger.info("All datasources search results count: %d", len(final_context_sections))
 
             # Check if all datasources results are relevant
             if search_pipeline.section_relevance is not None:
-                has_relevant_sections = any(search_pipeline.section_relevance_list)
-                if not has_relevant_sections:
+                section_relevance_list = search_pipeline.section_relevance_list
+                if not any(section_relevance_list):
                     logger.info("All datasources results not relevant, returning empty results")
                     # Return empty results if no relevant sections found
-                    yield ToolResponse(
-                        id=SEARCH_RESPONSE_SUMMARY_ID,
-                        response=SearchResponseSummary(
-                            rephrased_query=query,
-                            top_sections=[],
-                            predicted_flow=search_pipeline.predicted_flow,
-                            predicted_search=search_pipeline.predicted_search_type,
-                            final_filters=search_pipeline.search_query.filters,
-                            recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
-                        ),
-                    )
-                    yield ToolResponse(id=SEARCH_DOC_CONTENT_ID, response=OnyxContexts(contexts=[]))
-                    yield ToolResponse(id=SECTION_RELEVANCE_LIST_ID, response=[])
-                    yield ToolResponse(id=FINAL_CONTEXT_DOCUMENTS_ID, response=[])
+                    yield from _empty_search_responses(query, search_pipeline)
                     return
                 else:
-                    logger.info(f"Relevant details found across all datasources: {len(search_pipeline.final_context_sections)} sections")
+                    logger.info("Relevant details found across all datasources: %d sections", len(final_context_sections))
             else:
                 # LLM relevance filtering is disabled, so all sections are considered relevant
-                logger.info(f"LLM relevance filtering disabled, using all datasources results: {len(search_pipeline.final_context_sections)} sections")
+                logger.info("LLM relevance filtering disabled, using all datasources results: %d sections", len(final_context_sections))
+
+        # search_pipeline is settled from here on, so its lazily evaluated results
+        # are read once
+        final_context_sections = search_pipeline.final_context_sections
+        reranked_sections = search_pipeline.reranked_sections
+        search_query = search_pipeline.search_query
 
         yield ToolResponse(
             id=SEARCH_RESPONSE_SUMMARY_ID,
             response=SearchResponseSummary(
                 rephrased_query=query,
-                top_sections=search_pipeline.final_context_sections,
+                top_sections=final_context_sections,
                 predicted_flow=search_pipeline.predicted_flow,
                 predicted_search=search_pipeline.predicted_search_type,
-                final_filters=search_pipeline.search_query.filters,
-                recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
+                final_filters=search_query.filters,
+                recency_bias_multiplier=search_query.recency_bias_multiplier,
             ),
         )
 
+        contexts: list[OnyxContext] = []
+        for section in reranked_sections:
+            center_chunk = section.center_chunk
+            contexts.append(
+                OnyxContext(
+                    content=section.combined_content,
+                    document_id=center_chunk.document_id,
+                    semantic_identifier=center_chunk.semantic_identifier,
+                    blurb=center_chunk.blurb,
+                )
+            )
         yield ToolResponse(
             id=SEARCH_DOC_CONTENT_ID,
-            response=OnyxContexts(
-                contexts=[
-                    OnyxContext(
-                        content=section.combined_content,
-                        document_id=section.center_chunk.document_id,
-                        semantic_identifier=section.center_chunk.semantic_identifier,
-                        blurb=section.center_chunk.blurb,
-                    )
-                    for section in search_pipeline.reranked_sections
-                ]
-            ),
+            response=OnyxContexts(contexts=contexts),
         )
 
         # When LLM relevance filtering is disabled, section_relevance is None
@@ -725,15 +730,17 @@ Additionally, consider which knowledge bases might be useful as fallback options
         if section_relevance_response is None:
             # LLM relevance filtering is disabled, so all sections are considered relevant
             # Use reranked_sections to match the citations which are based on reranked_sections
-            section_relevance_response = [
-                SectionRelevancePiece(
-                    relevant=True,
-                    document_id=section.center_chunk.document_id,
-                    chunk_id=section.center_chunk.chunk_id,
+            section_relevance_response = []
+            for section in reranked_sections:
+                center_chunk = section.center_chunk
+                section_relevance_response.append(
+                    SectionRelevancePiece.model_construct(
+                        relevant=True,
+                        document_id=center_chunk.document_id,
+                        chunk_id=center_chunk.chunk_id,
+                    )
                 )
-                for section in search_pipeline.reranked_sections
-            ]
-        
+
         yield ToolResponse(
             id=SECTION_RELEVANCE_LIST_ID,
             response=section_relevance_response,
@@ -746,9 +753,12 @@ Additionally, consider which knowledge bases might be useful as fallback options
         #     relevant_count = sum(1 for rel in search_pipeline.section_relevance_list if rel)
         #     logger.info(f"Relevant sections count: {relevant_count}")
 
+        if section_relevance_list is None:
+            section_relevance_list = search_pipeline.section_relevance_list
+
         pruned_sections = prune_sections(
-            sections=search_pipeline.final_context_sections,
-            section_relevance_list=search_pipeline.section_relevance_list,
+            sections=final_context_sections,
+            section_relevance_list=section_relevance_list,
             prompt_config=self.prompt_config,
             llm_config=self.llm.config,
             question=query,
@@ -767,15 +777,38 @@ Additionally, consider which knowledge bases might be useful as fallback options
 
         yield ToolResponse(id=FINAL_CONTEXT_DOCUMENTS_ID, response=llm_docs)
 
+    def _make_pipeline(self, query: str, filters: IndexFilters) -> SearchPipeline:
+        return SearchPipeline(
+            search_request=SearchRequest(
+                query=query,
+                evaluation_type=self.evaluation_type,
+                human_selected_filters=filters,
+                persona=self.persona,
+                offset=self.retrieval_options.offset if self.retrieval_options else None,
+                limit=self.retrieval_options.limit if self.retrieval_options else None,
+                rerank_settings=self.rerank_settings,
+                chunks_above=self.chunks_above,
+                chunks_below=self.chunks_below,
+                full_doc=self.full_doc,
+                enable_auto_detect_filters=self.retrieval_options.enable_auto_detect_filters if self.retrieval_options else None,
+            ),
+            user=self.user,
+            llm=self.llm,
+            fast_llm=self.fast_llm,
+            bypass_acl=self.bypass_acl,
+            db_session=self.db_session,
+            prompt_config=self.prompt_config,
+        )
+
     def final_result(self, *args: ToolResponse) -> JSON_ro:
         final_docs = cast(
             list[LlmDoc],
             next(arg.response for arg in args if arg.id == FINAL_CONTEXT_DOCUMENTS_ID),
         )
-        # NOTE: need to do this json.loads(doc.json()) stuff because there are some
-        # subfields that are not serializable by default (datetime)
-        # this forces pydantic to make them JSON serializable for us
-        return [json.loads(doc.model_dump_json()) for doc in final_docs]
+        # NOTE: some subfields are not serializable by default (datetime), so
+        # pydantic is asked for JSON-mode dicts directly rather than round-tripping
+        # each doc through a JSON string
+        return [doc.model_dump(mode="json") for doc in final_docs]
 
     def build_next_prompt(
         self,
@@ -820,22 +853,26 @@ Additionally, consider which knowledge bases might be useful as fallback options
             ):
                 search_contexts = yield_item.response.contexts
                 # original_doc_search_rank = 1
+                # keep the first context of each document, in search order
+                seen_document_ids: set[str] = set()
                 for doc in search_contexts:
-                    if doc.document_id not in initial_search_results:
-                        initial_search_results.append(doc)
+                    if doc.document_id in seen_document_ids:
+                        continue
+                    seen_document_ids.add(doc.document_id)
+                    initial_search_results.append(doc)
 
                 initial_search_results = cast(list[LlmDoc], initial_search_results)
 
         return final_search_results, initial_search_results
 
-import copy
-import json
+import re
 from collections.abc import Callable
 from collections.abc import Generator
 from typing import Any
 from typing import cast
 from typing import TypeVar
 
+import orjson
 from sqlalchemy.orm import Session
 
 from onyx.chat.chat_utils import llm_doc_from_inference_section
@@ -891,6 +928,11 @@ SECTION_RELEVANCE_LIST_ID = "section_relevance_list"
 SEARCH_EVALUATION_ID = "llm_doc_eval"
 QUERY_FIELD = "query"
 
+_SKIP_SEARCH_RE = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|ok|okay|bye|goodbye)\s*[!.?]*\s*$",
+    re.IGNORECASE,
+)
+
 
 class SearchResponseSummary(SearchQueryInfo):
     top_sections: list[InferenceSection]
@@ -1040,14 +1082,14 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
         )
         final_context_docs = cast(list[LlmDoc], final_context_docs_response.response)
 
-        return json.dumps(
+        return orjson.dumps(
             {
                 "search_results": [
                     llm_doc_to_dict(doc, ind)
                     for ind, doc in enumerate(final_context_docs)
                 ]
             }
-        )
+        ).decode()
 
     """For LLMs that don't support tool calling"""
 
@@ -1058,6 +1100,9 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
         llm: LLM,
         force_run: bool = False,
     ) -> dict[str, Any] | None:
+        if not force_run and _SKIP_SEARCH_RE.match(query):
+            # greetings / acknowledgements never need a search, skip the LLM check
+            return None
         if not force_run and not check_if_need_search(
             query=query, history=history, llm=llm
         ):
@@ -1088,9 +1133,10 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             ),
         )
 
-        # Build selected sections for specified documents
+        # Build selected sections for specified documents. The ids come from already
+        # validated chunks, so the pieces are built without re-validating them
         selected_sections = [
-            SectionRelevancePiece(
+            SectionRelevancePiece.model_construct(
                 relevant=True,
                 document_id=section.center_chunk.document_id,
                 chunk_id=section.center_chunk.chunk_id,
@@ -1167,7 +1213,11 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             yield from self._build_response_for_specified_sections(query)
             return
 
-        retrieval_options = copy.deepcopy(self.retrieval_options) or RetrievalDetails()
+        retrieval_options = (
+            self.retrieval_options.model_copy(deep=True)
+            if self.retrieval_options
+            else RetrievalDetails()
+        )
         if document_sources or time_cutoff:
             # if empty, just start with an empty filters object
             if not retrieval_options.filters:
@@ -1185,7 +1235,6 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
                 # Overwrite time-cutoff should supercede existing time-cutoff, even if defined
                 retrieval_options.filters.time_cutoff = time_cutoff
 
-        retrieval_options = copy.deepcopy(retrieval_options) or RetrievalDetails()
         retrieval_options.filters = retrieval_options.filters or BaseFilters()
         if kg_entities:
             retrieval_options.filters.kg_entities = kg_entities
@@ -1251,10 +1300,11 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             contextual_pruning_config=self.contextual_pruning_config,
         )
 
+        search_query = search_pipeline.search_query
         search_query_info = SearchQueryInfo(
-            predicted_search=search_pipeline.search_query.search_type,
-            final_filters=search_pipeline.search_query.filters,
-            recency_bias_multiplier=search_pipeline.search_query.recency_bias_multiplier,
+            predicted_search=search_query.search_type,
+            final_filters=search_query.filters,
+            recency_bias_multiplier=search_query.recency_bias_multiplier,
         )
         yield from yield_search_responses(
             query=query,
@@ -1271,10 +1321,10 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             list[LlmDoc],
             next(arg.response for arg in args if arg.id == FINAL_CONTEXT_DOCUMENTS_ID),
         )
-        # NOTE: need to do this json.loads(doc.json()) stuff because there are some
-        # subfields that are not serializable by default (datetime)
-        # this forces pydantic to make them JSON serializable for us
-        return [json.loads(doc.model_dump_json()) for doc in final_docs]
+        # NOTE: some subfields are not serializable by default (datetime), so
+        # pydantic is asked for JSON-mode dicts directly rather than round-tripping
+        # each doc through a JSON string
+        return [doc.model_dump(mode="json") for doc in final_docs]
 
     def build_next_prompt(
         self,
@@ -158,5 +158,9 @@ def is_valid_email(text: str) -> bool:
         return False
 
 
+_DELETE_PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+
 def count_punctuation(text: str) -> int:
-    return sum(1 for char in text if char in string.punctuation)
+    # str.translate runs in C, much cheaper than a per-character Python loop
+    return len(text) - len(text.translate(_DELETE_PUNCTUATION_TABLE))
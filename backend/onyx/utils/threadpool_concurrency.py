@@ -1,5 +1,6 @@
 import time
 import uuid
+from collections import deque
 from collections.abc import Callable
 from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
@@ -12,6 +13,8 @@ import random
 from litellm.exceptions import RateLimitError  # type: ignore
 
 from onyx.configs.app_configs import LLM_API_CONCURRENCY_LIMIT
+from onyx.configs.app_configs import LLM_API_REQUESTS_PER_MINUTE
+from onyx.configs.app_configs import LLM_API_TOKENS_PER_MINUTE
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -30,6 +33,75 @@ def set_llm_concurrency_limit(limit: int) -> None:
         _LLM_API_SEMAPHORE = threading.Semaphore(limit)
 
 
+class TokenBucket:
+    """
+    Proactive requests-per-minute / tokens-per-minute limiter over a sliding window.
+    Callers block in acquire() until the request fits the budget, rather than
+    finding out about the limit from a 429 after a full round-trip.
+    A limit of 0 disables that dimension.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        window_seconds: float = 60.0,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window_seconds = window_seconds
+        self._events: deque[tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def acquire(self, tokens: int = 0) -> None:
+        if not self.enabled:
+            return
+
+        # a single request larger than the whole budget must still go through eventually
+        if self.tokens_per_minute > 0:
+            tokens = min(tokens, self.tokens_per_minute)
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._events and now - self._events[0][0] >= self._window_seconds:
+                    _, expired_tokens = self._events.popleft()
+                    self._tokens_in_window -= expired_tokens
+
+                requests_ok = (
+                    self.requests_per_minute <= 0
+                    or len(self._events) < self.requests_per_minute
+                )
+                tokens_ok = (
+                    self.tokens_per_minute <= 0
+                    or self._tokens_in_window + tokens <= self.tokens_per_minute
+                )
+                if requests_ok and tokens_ok:
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+
+                wait_time = self._window_seconds - (now - self._events[0][0])
+
+            time.sleep(max(wait_time, 0.01))
+
+
+_LLM_API_TOKEN_BUCKET = TokenBucket(
+    requests_per_minute=LLM_API_REQUESTS_PER_MINUTE,
+    tokens_per_minute=LLM_API_TOKENS_PER_MINUTE,
+)
+
+
+def get_llm_api_token_bucket() -> TokenBucket:
+    """Process-wide request/token budget shared by all LLM API callers."""
+    return _LLM_API_TOKEN_BUCKET
+
+
 def retry_with_exponential_backoff(
     func: Callable,
     args: tuple,
@@ -85,6 +157,7 @@ def run_functions_tuples_in_parallel_with_rate_limiting(
     max_workers: int | None = None,
     use_rate_limiting: bool = True,
     use_retry: bool = True,
+    pre_acquire_fn: Callable[[int], None] | None = None,
 ) -> list[Any]:
     """
     Executes multiple functions in parallel with rate limiting and retry logic.
@@ -96,6 +169,8 @@ def run_functions_tuples_in_parallel_with_rate_limiting(
         max_workers: Max number of worker threads
         use_rate_limiting: Whether to use semaphore-based rate limiting
         use_retry: Whether to use exponential backoff retry for rate limit errors
+        pre_acquire_fn: Optional callable invoked with the function index before dispatch,
+            e.g. to block on a TokenBucket until the call fits the rate budget
 
     Returns:
         list: A list of results for each function.
@@ -112,6 +187,8 @@ def run_functions_tuples_in_parallel_with_rate_limiting(
 
     def execute_with_limits(func: Callable, args: tuple, index: int) -> tuple[int, Any]:
         """Execute function with rate limiting and retry logic."""
+        if pre_acquire_fn is not None:
+            pre_acquire_fn(index)
         if use_rate_limiting:
             with _LLM_API_SEMAPHORE:
                 if use_retry:
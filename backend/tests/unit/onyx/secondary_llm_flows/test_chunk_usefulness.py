@@ -0,0 +1,127 @@
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.messages import AIMessage
+from pytest_mock import MockerFixture
+
+from onyx.secondary_llm_flows import chunk_usefulness
+from onyx.secondary_llm_flows.chunk_usefulness import _build_batch_prompt
+from onyx.secondary_llm_flows.chunk_usefulness import llm_batch_eval_sections
+from onyx.secondary_llm_flows.chunk_usefulness import llm_eval_sections_single_batch
+
+
+@pytest.fixture
+def mock_llm() -> Mock:
+    llm = Mock()
+    llm.config = Mock()
+    llm.config.model_provider = "openai"
+    llm.config.model_name = "gpt-4o"
+    return llm
+
+
+@pytest.fixture(autouse=True)
+def no_token_counting(mocker: MockerFixture) -> None:
+    mocker.patch.object(
+        chunk_usefulness, "check_tokens_of_batched_prompt", return_value=0
+    )
+    chunk_usefulness._SECTION_VERDICT_CACHE.clear()
+
+
+def test_build_batch_prompt_renders_shared_metadata_once() -> None:
+    metadata = {"author": "alice", "tags": ["a", "b"]}
+    prompt = _build_batch_prompt(
+        query="q",
+        section_contents=["first", "second"],
+        titles=["Title\nOne", "Two"],
+        metadata_list=[metadata, metadata],
+    )
+
+    assert "1. Title: Title One\nMetadata:\nauthor - alice\ntags - a, bContent: first" in prompt
+    assert "2. Title: Two\nMetadata:\nauthor - alice\ntags - a, bContent: second" in prompt
+
+
+def test_single_batch_parses_verdicts_and_defaults_missing_to_relevant(
+    mock_llm: Mock,
+) -> None:
+    mock_llm.invoke.return_value = AIMessage(content="1: No\n**2**: yes\n- 4: NO")
+
+    results = llm_eval_sections_single_batch(
+        query="q",
+        section_contents=["a", "b", "c", "d"],
+        llm=mock_llm,
+        titles=["t"] * 4,
+        metadata_list=[{}] * 4,
+    )
+
+    assert results == [False, True, True, False]
+
+
+def test_single_batch_only_caches_complete_verdicts(mock_llm: Mock) -> None:
+    def evaluate() -> list[bool]:
+        return llm_eval_sections_single_batch(
+            query="q",
+            section_contents=["a", "b"],
+            llm=mock_llm,
+            titles=["t"] * 2,
+            metadata_list=[{}] * 2,
+        )
+
+    # section 2 is missing, so its default verdict must not be remembered
+    mock_llm.invoke.return_value = AIMessage(content="1: No")
+    assert evaluate() == [False, True]
+    mock_llm.invoke.return_value = AIMessage(content="1: No\n2: No")
+    assert evaluate() == [False, False]
+    assert evaluate() == [False, False]
+    assert mock_llm.invoke.call_count == 2
+
+
+def test_batch_eval_keeps_original_order_with_length_bucketing(
+    mock_llm: Mock, mocker: MockerFixture
+) -> None:
+    # a section is relevant iff its content contains "keep"
+    def fake_single_batch(query, section_contents, llm, titles, metadata_list, *_):  # type: ignore
+        return ["keep" in content for content in section_contents]
+
+    mocker.patch.object(
+        chunk_usefulness, "llm_eval_sections_single_batch", side_effect=fake_single_batch
+    )
+    section_contents = ["keep" + "x" * 50, "drop", "keep", "drop" + "y" * 100, "keep!!"]
+
+    results = llm_batch_eval_sections(
+        query="q",
+        section_contents=section_contents,
+        llm=mock_llm,
+        titles=["t"] * len(section_contents),
+        metadata_list=[{}] * len(section_contents),
+        use_threads=False,
+        batch_size=2,
+    )
+
+    assert results == [True, False, True, False, True]
+
+
+def test_failed_trailing_batch_does_not_misalign_results(
+    mock_llm: Mock, mocker: MockerFixture
+) -> None:
+    def fake_single_batch(query, section_contents, llm, titles, metadata_list, *_):  # type: ignore
+        if "boom" in section_contents:
+            raise RuntimeError("batch failed")
+        return [True] * len(section_contents)
+
+    mocker.patch.object(
+        chunk_usefulness, "llm_eval_sections_single_batch", side_effect=fake_single_batch
+    )
+    section_contents = ["a", "b", "c", "boom"]
+
+    results = llm_batch_eval_sections(
+        query="q",
+        section_contents=section_contents,
+        llm=mock_llm,
+        titles=["t"] * len(section_contents),
+        metadata_list=[{}] * len(section_contents),
+        use_threads=True,
+        batch_size=3,
+        preserve_order=True,
+    )
+
+    assert results == [True, True, True, False]
@@ -82,12 +82,13 @@ class TestCustomTool(unittest.TestCase):
             chat_session_id=uuid.uuid4(), message_id=20
         )
 
-    @patch("onyx.tools.tool_implementations.custom.custom_tool.requests.request")
+    @patch("onyx.tools.tool_implementations.custom.custom_tool._HTTP_SESSION.request")
     def test_custom_tool_run_get(self, mock_request: unittest.mock.MagicMock) -> None:
         """
         Test the GET method of a custom tool.
         Verifies that the tool correctly constructs the URL and makes the GET request.
         """
+        mock_request.return_value.content = b"{}"
         tools = build_custom_tools_from_openapi_schema_and_headers(
             tool_id=-1,  # dummy tool id
             openapi_schema=self.openapi_schema,
@@ -96,7 +97,9 @@ class TestCustomTool(unittest.TestCase):
 
         result = list(tools[0].run(assistant_id="123"))
         expected_url = f"http://localhost:8080/{self.dynamic_schema_info.chat_session_id}/test/{self.dynamic_schema_info.message_id}/assistant/123"
-        mock_request.assert_called_once_with("GET", expected_url, json=None, headers={})
+        mock_request.assert_called_once_with(
+            "GET", expected_url, json=None, headers={}, stream=True
+        )
 
         self.assertEqual(
             len(result), 1, "Expected exactly one result from the tool run"
@@ -112,12 +115,13 @@ class TestCustomTool(unittest.TestCase):
             "Tool name in response does not match expected value",
         )
 
-    @patch("onyx.tools.tool_implementations.custom.custom_tool.requests.request")
+    @patch("onyx.tools.tool_implementations.custom.custom_tool._HTTP_SESSION.request")
     def test_custom_tool_run_post(self, mock_request: unittest.mock.MagicMock) -> None:
         """
         Test the POST method of a custom tool.
         Verifies that the tool correctly constructs the URL and makes the POST request with the given body.
         """
+        mock_request.return_value.content = b"{}"
         tools = build_custom_tools_from_openapi_schema_and_headers(
             tool_id=-1,  # dummy tool id
             openapi_schema=self.openapi_schema,
@@ -127,7 +131,7 @@ class TestCustomTool(unittest.TestCase):
         result = list(tools[1].run(assistant_id="456"))
         expected_url = f"http://localhost:8080/{self.dynamic_schema_info.chat_session_id}/test/{self.dynamic_schema_info.message_id}/assistant/456"
         mock_request.assert_called_once_with(
-            "POST", expected_url, json=None, headers={}
+            "POST", expected_url, json=None, headers={}, stream=True
         )
 
         self.assertEqual(
@@ -144,7 +148,7 @@ class TestCustomTool(unittest.TestCase):
             "Tool name in response does not match expected value",
         )
 
-    @patch("onyx.tools.tool_implementations.custom.custom_tool.requests.request")
+    @patch("onyx.tools.tool_implementations.custom.custom_tool._HTTP_SESSION.request")
     def test_custom_tool_with_headers(
         self, mock_request: unittest.mock.MagicMock
     ) -> None:
@@ -152,6 +156,7 @@ class TestCustomTool(unittest.TestCase):
         Test the custom tool with custom headers.
         Verifies that the tool correctly includes the custom headers in the request.
         """
+        mock_request.return_value.content = b"{}"
         custom_headers: list[HeaderItemDict] = [
             {"key": "Authorization", "value": "Bearer token123"},
             {"key": "Custom-Header", "value": "CustomValue"},
@@ -170,10 +175,10 @@ class TestCustomTool(unittest.TestCase):
             "Custom-Header": "CustomValue",
         }
         mock_request.assert_called_once_with(
-            "GET", expected_url, json=None, headers=expected_headers
+            "GET", expected_url, json=None, headers=expected_headers, stream=True
         )
 
-    @patch("onyx.tools.tool_implementations.custom.custom_tool.requests.request")
+    @patch("onyx.tools.tool_implementations.custom.custom_tool._HTTP_SESSION.request")
     def test_custom_tool_with_empty_headers(
         self, mock_request: unittest.mock.MagicMock
     ) -> None:
@@ -181,6 +186,7 @@ class TestCustomTool(unittest.TestCase):
         Test the custom tool with an empty list of custom headers.
         Verifies that the tool correctly handles an empty list of headers.
         """
+        mock_request.return_value.content = b"{}"
         custom_headers: list[HeaderItemDict] = []
         tools = build_custom_tools_from_openapi_schema_and_headers(
             tool_id=-1,  # dummy tool id
@@ -191,7 +197,9 @@ class TestCustomTool(unittest.TestCase):
 
         list(tools[0].run(assistant_id="123"))
         expected_url = f"http://localhost:8080/{self.dynamic_schema_info.chat_session_id}/test/{self.dynamic_schema_info.message_id}/assistant/123"
-        mock_request.assert_called_once_with("GET", expected_url, json=None, headers={})
+        mock_request.assert_called_once_with(
+            "GET", expected_url, json=None, headers={}, stream=True
+        )
 
     def test_invalid_openapi_schema(self) -> None:
         """
@@ -0,0 +1,22 @@
+import string
+
+import pytest
+
+from onyx.utils.text_processing import count_punctuation
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "no punctuation here",
+        "What's the status of ticket #123?",
+        "a.b,c;d:e!f?g",
+        "unicode — “quotes” are not ascii punctuation…",
+        string.punctuation * 3,
+    ],
+)
+def test_count_punctuation_matches_naive_count(text: str) -> None:
+    assert count_punctuation(text) == sum(
+        1 for char in text if char in string.punctuation
+    )
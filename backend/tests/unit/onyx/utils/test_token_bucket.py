@@ -0,0 +1,49 @@
+import time
+
+from onyx.utils.threadpool_concurrency import TokenBucket
+
+
+def test_token_bucket_disabled_never_blocks() -> None:
+    bucket = TokenBucket(requests_per_minute=0, tokens_per_minute=0)
+    assert not bucket.enabled
+
+    start = time.monotonic()
+    for _ in range(100):
+        bucket.acquire(10_000)
+    assert time.monotonic() - start < 1
+
+
+def test_token_bucket_request_limit() -> None:
+    bucket = TokenBucket(requests_per_minute=2, tokens_per_minute=0, window_seconds=1)
+
+    start = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    time_to_finish_non_ratelimited = time.monotonic() - start
+
+    # third request must wait for the window to roll over
+    bucket.acquire()
+    time_to_finish_ratelimited = time.monotonic() - start
+
+    assert time_to_finish_non_ratelimited < 0.5
+    assert time_to_finish_ratelimited >= 0.9
+
+
+def test_token_bucket_token_limit() -> None:
+    bucket = TokenBucket(requests_per_minute=0, tokens_per_minute=100, window_seconds=1)
+
+    start = time.monotonic()
+    bucket.acquire(60)
+    bucket.acquire(40)
+    assert time.monotonic() - start < 0.5
+
+    bucket.acquire(1)
+    assert time.monotonic() - start >= 0.9
+
+
+def test_token_bucket_oversized_request_is_clamped() -> None:
+    bucket = TokenBucket(requests_per_minute=0, tokens_per_minute=100, window_seconds=1)
+
+    start = time.monotonic()
+    bucket.acquire(1_000)
+    assert time.monotonic() - start < 0.5